@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from api.endpoints import agent_rag, upload
+from api.endpoints import agent_rag, upload, stats, health
 
 
 api_router = APIRouter()
 api_router.include_router(upload.router, tags=['upload'])
-api_router.include_router(agent_rag.router, tags=['agent_rag'])
\ No newline at end of file
+api_router.include_router(agent_rag.router, tags=['agent_rag'])
+api_router.include_router(stats.router, tags=['stats'])
+api_router.include_router(health.router, tags=['health'])
\ No newline at end of file
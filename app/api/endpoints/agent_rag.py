@@ -1,47 +1,78 @@
+import json
+import logging
 from fastapi import APIRouter, Request
-from services.rag_agent.agent_graph import get_graph
+from fastapi.responses import StreamingResponse
+from services.rag_agent.answer_cache import get_answer_cache, ANSWER_CACHE_ENABLED
+from services.rag_agent.reranker import RERANK_ENABLED
+from services.rag_agent.router import SEARCH_TOOL, has_booking_cue
 from utils.mongodb_message_builder import build_rag_message, build_conversation_record
 from utils.crud import ConversationStore
+from utils.single_flight import get_single_flight
+from utils.utils import normalize_text, text_fingerprint
 import os
 from services.rag_agent.chat_history import get_chat_history_from_mongo
 from schemas.schemas import AgentRequest, AgentResponse
 
 
 router = APIRouter()
-graph = get_graph()
+_graph = None
 
+# Graph node whose update carries the documents passed to synthesis
+RETRIEVAL_NODE = "rerank" if RERANK_ENABLED else "run_tool"
 
-@router.post("/agent_rag", response_model=AgentResponse)
-async def agent_rag_endpoint(payload: AgentRequest, request: Request):
-    conversation_store = ConversationStore(
-        collection_name="rag_conversations",
+# Answers that describe a failure rather than the corpus are never cached
+UNCACHEABLE_ANSWER_PREFIXES = ("Error executing tool", "No relevant information")
+
+
+def is_cacheable_answer(result: dict) -> bool:
+    answer = result.get("tool_output")
+    return (
+        result.get("selected_tool") == "search_knowledge_base"
+        and isinstance(answer, str)
+        and not answer.startswith(UNCACHEABLE_ANSWER_PREFIXES)
     )
 
+
+def use_answer_cache(chat_history: list) -> bool:
+    """
+    The answer cache is keyed by the query alone, so follow-up questions
+    (whose meaning depends on the history) neither read nor fill it.
+    """
+    return ANSWER_CACHE_ENABLED and not chat_history
+
+
+def get_agent_graph():
+    """
+    Returns the compiled agent graph, building it on first use. The graph
+    module pulls in LangGraph and the vector store stack, so it is imported
+    here (or by the startup warm-up) rather than when the app is imported.
+    """
+    global _graph
+    if _graph is None:
+        from services.rag_agent.agent_graph import get_graph
+
+        _graph = get_graph()
+    return _graph
+
+
+def get_conversation_id(request: Request):
     # Determine conversation ID
     if (
         hasattr(request.app.state, "conversation_id")
         and request.app.state.conversation_id
     ):
-        conv_id = request.app.state.conversation_id
-    else:
-        conv_id = None
-
-    chat_history = get_chat_history_from_mongo(conv_id)
-
-    print(f"Chat history for conversation {conv_id}: {chat_history}")
+        return request.app.state.conversation_id
+    return None
 
-    # Invoke agent graph with history
-    result = await graph.ainvoke(
-        {
-            "user_input": payload.query,
-            "chat_history": chat_history,
-        },
-        config={"run_name": "agent_rag_flow", "metadata": {"query": payload.query}},
-    )
 
+async def save_conversation_turn(request: Request, conv_id, query: str, result: dict):
     if result.get("selected_tool") == "search_knowledge_base":
+        conversation_store = ConversationStore(
+            collection_name="rag_conversations",
+        )
+
         # Save new Q&A
-        messages = build_rag_message(payload.query, result["tool_output"])
+        messages = build_rag_message(query, result["tool_output"])
         conversation = build_conversation_record(messages=messages)
 
         if conv_id:
@@ -49,5 +80,160 @@ async def agent_rag_endpoint(payload: AgentRequest, request: Request):
         else:
             conv_id = await conversation_store.create_new_conversation(conversation)
             request.app.state.conversation_id = conv_id
+    return conv_id
+
+
+def build_graph_input(query: str, chat_history: list):
+    graph_input = {
+        "user_input": query,
+        "chat_history": chat_history,
+    }
+    config = {"run_name": "agent_rag_flow", "metadata": {"query": query}}
+    return graph_input, config
+
+
+def graph_flight_key(query: str, chat_history: list, corpus_version: int) -> tuple:
+    """
+    Key under which identical concurrent requests share one graph run: the
+    normalized query, the corpus version and a digest of the chat history
+    (which the router uses to rewrite follow-up questions).
+    """
+    history_digest = text_fingerprint(json.dumps(chat_history, default=str, sort_keys=True))
+    return normalize_text(query).lower(), corpus_version, history_digest
+
+
+@router.post("/agent_rag", response_model=AgentResponse)
+async def agent_rag_endpoint(payload: AgentRequest, request: Request):
+    conv_id = get_conversation_id(request)
+
+    chat_history = await get_chat_history_from_mongo(conv_id)
+
+    print(f"Chat history for conversation {conv_id}: {chat_history}")
+
+    # Serve near-identical questions from the semantic answer cache
+    answer_cache = get_answer_cache()
+    cache_enabled = use_answer_cache(chat_history)
+    cached_answer = await answer_cache.lookup(payload.query) if cache_enabled else None
+
+    if cached_answer is not None:
+        result = {"selected_tool": "search_knowledge_base", "tool_output": cached_answer}
+    else:
+        corpus_version = answer_cache.corpus_version()
+
+        ran_graph = False
+
+        async def run_graph():
+            nonlocal ran_graph
+            ran_graph = True
+            # Invoke agent graph with history
+            graph_input, config = build_graph_input(payload.query, chat_history)
+            result = await get_agent_graph().ainvoke(graph_input, config=config)
+
+            if cache_enabled and is_cacheable_answer(result):
+                await answer_cache.store(payload.query, result["tool_output"], corpus_version)
+            return result
+
+        if has_booking_cue(payload.query):
+            # Bookings have side effects (a saved booking, an e-mail), never share them
+            result = await run_graph()
+        else:
+            # Concurrent identical questions await the same graph run
+            result = await get_single_flight("agent_graph").do(
+                graph_flight_key(payload.query, chat_history, corpus_version), run_graph
+            )
+            if not ran_graph and result.get("selected_tool") != SEARCH_TOOL:
+                # The shared run was routed to another tool, run our own
+                result = await run_graph()
+
+    # Every caller persists its own turn
+    await save_conversation_turn(request, conv_id, payload.query, result)
 
     return AgentResponse(result=result["tool_output"])
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def describe_documents(docs) -> list:
+    if not isinstance(docs, list):
+        return []
+    return [
+        {
+            "file_name": doc.metadata.get("file_name"),
+            "page_no": doc.metadata.get("page_no"),
+            "score": score,
+        }
+        for doc, score in docs
+    ]
+
+
+@router.post("/agent_rag/stream")
+async def agent_rag_stream_endpoint(payload: AgentRequest, request: Request):
+    """
+    Streams graph progress and synthesis tokens as server-sent events:
+    `tool_selected`, `documents_retrieved`, `token` (repeated) and finally
+    `done` with the full answer, which is persisted once the stream ends.
+    A failure mid-stream sends an `error` event, then `done` with no result,
+    and nothing is persisted.
+    """
+    conv_id = get_conversation_id(request)
+    chat_history = await get_chat_history_from_mongo(conv_id)
+
+    async def event_stream():
+        # Stays None when the stream fails, the client still gets `done`
+        answer = None
+        try:
+            answer_cache = get_answer_cache()
+            cache_enabled = use_answer_cache(chat_history)
+            cached_answer = await answer_cache.lookup(payload.query) if cache_enabled else None
+
+            if cached_answer is not None:
+                result = {"selected_tool": "search_knowledge_base", "tool_output": cached_answer}
+                yield format_sse("tool_selected", {"tool": result["selected_tool"], "cached": True})
+                yield format_sse("token", {"text": cached_answer})
+            else:
+                corpus_version = answer_cache.corpus_version()
+                graph_input, config = build_graph_input(payload.query, chat_history)
+                result = {}
+
+                async for mode, chunk in get_agent_graph().astream(
+                    graph_input, config=config, stream_mode=["updates", "custom", "values"]
+                ):
+                    if mode == "custom" and "token" in chunk:
+                        yield format_sse("token", {"text": chunk["token"]})
+                    elif mode == "updates" and "process_input" in chunk:
+                        state = chunk["process_input"]
+                        yield format_sse("tool_selected", {
+                            "tool": state.get("selected_tool"),
+                            "tool_input": state.get("tool_input"),
+                        })
+                    elif mode == "updates" and RETRIEVAL_NODE in chunk:
+                        state = chunk[RETRIEVAL_NODE]
+                        if state.get("selected_tool") == "search_knowledge_base":
+                            documents = describe_documents(state.get("tool_output"))
+                            yield format_sse("documents_retrieved", {
+                                "count": len(documents),
+                                "documents": documents,
+                                "timings": state.get("timings") or {},
+                            })
+                    elif mode == "values":
+                        result = chunk
+
+                if cache_enabled and is_cacheable_answer(result):
+                    await answer_cache.store(payload.query, result["tool_output"], corpus_version)
+
+            # Only a completed answer is persisted
+            if result.get("tool_output") is not None:
+                await save_conversation_turn(request, conv_id, payload.query, result)
+            answer = result.get("tool_output")
+        except Exception as e:
+            logging.error(f"Error streaming agent response: {e}")
+            yield format_sse("error", {"message": str(e)})
+        yield format_sse("done", {"result": answer})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
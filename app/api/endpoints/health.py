@@ -0,0 +1,50 @@
+import asyncio
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from db.mongodb_instance import AsyncMongoDBInstance
+from services.ingestion.singleton_wrapper import get_vector_store_registry
+
+
+# Dependency checks never hold a readiness probe longer than this
+READINESS_TIMEOUT_SECONDS = 2.0
+
+
+router = APIRouter()
+
+
+async def _check(coro):
+    try:
+        await asyncio.wait_for(coro, timeout=READINESS_TIMEOUT_SECONDS)
+        return "ok"
+    except Exception as e:
+        return f"error: {e}"
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once the vector store registry has warmed up and
+    MongoDB and Qdrant answer a ping, 503 otherwise.
+    """
+    registry = get_vector_store_registry()
+    if not registry.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"ready": False, "warmup": "failed" if registry.warmup_error else "pending",
+                     "error": registry.warmup_error},
+        )
+
+    mongodb, qdrant = await asyncio.gather(
+        _check(AsyncMongoDBInstance().health_check()),
+        _check((await registry.get_aclient()).get_collections()),
+    )
+    is_ready = mongodb == "ok" and qdrant == "ok"
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "ready": is_ready,
+            "warmup_seconds": registry.warmup_seconds,
+            "mongodb": mongodb,
+            "qdrant": qdrant,
+        },
+    )
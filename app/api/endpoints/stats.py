@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from services.ingestion.singleton_wrapper import get_vector_store_registry
+from services.rag_agent.answer_cache import get_answer_cache
+from services.rag_agent.router import get_fast_path_router
+from services.rag_agent.reranker import get_reranker
+from services.rag_agent.speculation import get_speculative_retrieval
+from utils.single_flight import single_flight_stats
+
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_stats():
+    """
+    Reports cache and routing counters for monitoring.
+    """
+    # embedding_cache imports langchain_qdrant, keep it off the startup path
+    from services.ingestion.embedding_cache import get_embedding_cache
+
+    return {
+        "embedding_cache": get_embedding_cache().stats(),
+        "answer_cache": get_answer_cache().stats(),
+        "router": get_fast_path_router().stats(),
+        "reranker": get_reranker().stats(),
+        "speculative_retrieval": get_speculative_retrieval().stats(),
+        "single_flight": single_flight_stats(),
+        "vector_store_registry": get_vector_store_registry().stats(),
+    }
@@ -1,60 +1,84 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import JSONResponse
-from pathlib import Path
-from uuid import uuid4
-from services.ingestion.loader import DocumentLoader
-from services.ingestion.splitter import TextChunker
-from services.ingestion.vectorstore import LangChainQdrantStore
+from typing import List
+from services.ingestion.job_queue import get_job_queue, JobQueueFullError
+from services.ingestion.spool import spool_upload, UploadError, UploadTooLargeError
+from schemas.schemas import IngestionJobResponse
 
 
 router = APIRouter()
 
 MAX_FILE_SIZE_MB = 20  # optional limit (in MB)
+ALLOWED_SUFFIXES = (".pdf", ".txt")
+COLLECTION_NAME = "uploaded_documents"
 
-@router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    if not file.filename.endswith((".pdf", ".txt")):
-        raise HTTPException(status_code=400, detail="Only .pdf and .txt files are supported.")
-    
-    # Optional: File size check
-    contents = await file.read()
-    file_size_mb = len(contents) / (1024 * 1024)
-    if file_size_mb > MAX_FILE_SIZE_MB:
+# The body is parsed by hand (see spool_upload), so describe it for the docs
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+@router.post("/upload", status_code=202, openapi_extra=UPLOAD_REQUEST_BODY)
+async def upload_file(request: Request):
+    # Stream the body to the spool directory, enforcing the size limit on the way
+    try:
+        upload = await spool_upload(
+            request,
+            max_bytes=MAX_FILE_SIZE_MB * 1024 * 1024,
+            allowed_suffixes=ALLOWED_SUFFIXES,
+        )
+    except UploadTooLargeError:
         raise HTTPException(status_code=413, detail=f"File exceeds {MAX_FILE_SIZE_MB} MB limit.")
-    
-    # Save with unique filename to avoid collision
-    root_dir = Path.cwd()
-    unique_name = f"{uuid4().hex}_{file.filename}"
-    save_path = root_dir / unique_name
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     try:
-        # Save the file
-        with open(save_path, "wb") as f:
-            f.write(contents)
-
-        # Load and split document
-        loader = DocumentLoader(str(save_path))
-        documents = loader.load()
-
-        documents = TextChunker().split_documents(documents)
-        
-    #   #  Optionally store in vector DB
-        vector_store = LangChainQdrantStore(collection_name="uploaded_documents")
-        vector_store.store_documents(documents)
-
-        # Clean up uploaded file
-        save_path.unlink()
-
-        return JSONResponse(content={
-            "filename": file.filename,
-            "num_documents": len(documents),
-            "preview": documents[0].page_content[:300] if documents else "",
-            "metadata": documents[0].metadata if documents else {},
-            "collection_name": vector_store.collection_name
-        })
+        # Hand the file over to the ingestion workers; they delete it when done
+        job = await get_job_queue().submit(
+            upload.path,
+            upload.file_name,
+            COLLECTION_NAME,
+            content_hash=upload.content_hash,
+            size_bytes=upload.size_bytes,
+        )
 
+    except JobQueueFullError as e:
+        if upload.path.exists():
+            upload.path.unlink()
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         # Cleanup on error
-        if save_path.exists():
-            save_path.unlink()
+        if upload.path.exists():
+            upload.path.unlink()
         raise HTTPException(status_code=500, detail=str(e))
+
+    return JSONResponse(status_code=202, content={
+        "job_id": job.job_id,
+        "status": job.status,
+        "filename": upload.file_name,
+        "content_hash": upload.content_hash,
+        "collection_name": COLLECTION_NAME,
+    })
+
+
+@router.get("/upload/jobs", response_model=List[IngestionJobResponse])
+async def list_upload_jobs():
+    return [job.to_dict() for job in get_job_queue().list_jobs()]
+
+
+@router.get("/upload/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_upload_job(job_id: str):
+    job = get_job_queue().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No ingestion job found with id: {job_id}")
+    return job.to_dict()
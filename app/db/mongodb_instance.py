@@ -1,10 +1,27 @@
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 from dotenv import load_dotenv
 import os
 from pymongo.errors import ConnectionFailure
 
 load_dotenv()
 
+DATABASE_NAME = 'agentic_rag_database'
+
+
+def get_client_options():
+    """
+    Connection pool settings shared by the sync and async clients.
+    """
+    return {
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+        "waitQueueTimeoutMS": int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+    }
+
+
 class MongoDBInstance:
     """
     The code snippet implements a singleton pattern for creating a MongoDB instance with a shared
@@ -26,12 +43,21 @@ class MongoDBInstance:
         return cls._instance
 
     def _init_connection(self):
-        self.client = MongoClient(os.getenv("MONGODB_URI"))
-        self.db = self.client['agentic_rag_database']
+        self.client = MongoClient(os.getenv("MONGODB_URI"), **get_client_options())
+        self.db = self.client[DATABASE_NAME]
+        self._collections = {}
 
     def get_database(self):
         return self.db
 
+    def get_collection(self, collection_name: str):
+        """
+        Returns a cached collection handle (no server round trip).
+        """
+        if collection_name not in self._collections:
+            self._collections[collection_name] = self.db[collection_name]
+        return self._collections[collection_name]
+
     def health_check(self):
         """
         Checks the health of the MongoDB connection.
@@ -44,4 +70,55 @@ class MongoDBInstance:
         except ConnectionFailure as e:
             raise ConnectionFailure("MongoDB is not connected") from e
         except Exception as e:
-            raise Exception(f"Unexpected error occurred: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Unexpected error occurred: {str(e)}")
+
+
+class AsyncMongoDBInstance:
+    """
+    Singleton around a pooled `AsyncMongoClient`, used by the request path so
+    database calls never block the event loop. Collection handles are
+    resolved once per process and cached.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncMongoDBInstance, cls).__new__(cls)
+            cls._instance._init_connection()
+        return cls._instance
+
+    def _init_connection(self):
+        self.client = AsyncMongoClient(os.getenv("MONGODB_URI"), **get_client_options())
+        self.db = self.client[DATABASE_NAME]
+        self._collections = {}
+
+    def get_database(self):
+        return self.db
+
+    def get_collection(self, collection_name: str):
+        """
+        Returns a cached collection handle (no server round trip).
+        """
+        if collection_name not in self._collections:
+            self._collections[collection_name] = self.db[collection_name]
+        return self._collections[collection_name]
+
+    async def health_check(self):
+        """
+        Checks the health of the MongoDB connection.
+        :return: True if the connection is healthy, otherwise raises an exception.
+        """
+        try:
+            await self.client.admin.command("ping")
+            return True
+        except ConnectionFailure as e:
+            raise ConnectionFailure("MongoDB is not connected") from e
+        except Exception as e:
+            raise Exception(f"Unexpected error occurred: {str(e)}")
+
+    @classmethod
+    async def close(cls):
+        if cls._instance is not None:
+            await cls._instance.client.close()
+            cls._instance = None
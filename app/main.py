@@ -1,8 +1,18 @@
+import asyncio
 import platform
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 from api.api import api_router
+from api.endpoints.agent_rag import get_agent_graph
+from services.ingestion.job_queue import get_job_queue
+from services.ingestion.singleton_wrapper import get_vector_store_registry
+from db.mongodb_instance import AsyncMongoDBInstance
+from utils.crud import ensure_indexes
+from api.endpoints.upload import COLLECTION_NAME
+from services.rag_agent.llm import configure_langsmith
+from services.rag_agent.context_packer import get_token_counter
 
 
 
@@ -17,7 +27,44 @@ if platform.system() == "Windows":
     pathlib.PosixPath = pathlib.WindowsPath
 
 
-app = FastAPI(root_path="/api/v1")
+def warm_up():
+    """
+    Builds the agent graph (importing LangGraph, LangChain and the Qdrant
+    stack), the synthesis tokenizer and the shared vector store clients and
+    models. Blocking, runs in
+    a thread after the server is up; /ready reports when it has finished.
+    """
+    try:
+        get_agent_graph()
+    except Exception as e:
+        logger.error(f"Could not build the agent graph: {e}")
+    # Loads (and possibly downloads) the synthesis tokenizer
+    get_token_counter()
+    get_vector_store_registry().warm_up([COLLECTION_NAME])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_langsmith()
+
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        logger.error(f"Could not create MongoDB indexes: {e}")
+
+    # Heavy imports and clients are loaded in the background
+    warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+
+    # Start the background ingestion workers before serving uploads
+    job_queue = get_job_queue()
+    await job_queue.start()
+    yield
+    warmup_task.cancel()
+    await job_queue.stop()
+    await AsyncMongoDBInstance.close()
+
+
+app = FastAPI(root_path="/api/v1", lifespan=lifespan)
 
 
 # Register routes from the blueprint
@@ -8,9 +8,17 @@ class AgentRequest(BaseModel):
 class AgentResponse(BaseModel):
     result: str
 
+class SearchFilters(BaseModel):
+    file_name: Optional[str] = Field(default=None, description="Only search this file (exact file name with extension, e.g. 'handbook.pdf')")
+    page_from: Optional[int] = Field(default=None, description="Only search from this page on (1-based, inclusive)")
+    page_to: Optional[int] = Field(default=None, description="Only search up to this page (1-based, inclusive)")
+    uploaded_after: Optional[str] = Field(default=None, description="Only search documents uploaded at or after this ISO 8601 date/time")
+    uploaded_before: Optional[str] = Field(default=None, description="Only search documents uploaded at or before this ISO 8601 date/time")
+
 class SearchAction(BaseModel):
     action_type: Literal["search"] = "search"
     query: str = Field(description="The search query or question to look up")
+    filters: Optional[SearchFilters] = Field(default=None, description="Restrict the search when the query is about a specific file, pages or upload dates")
 
 class BookingAction(BaseModel):
     action_type: Literal["booking"] = "booking"
@@ -30,12 +38,15 @@ class AgentState(TypedDict):
     tool_input: Optional[dict]
     tool_output: Optional[Union[str, list]]
     chat_history: Optional[list]
+    timings: Optional[dict]
+    speculative_output: Optional[list]
 
 
 # Unified structured output models
 class SearchAction(BaseModel):
     action_type: Literal["search"] = "search"
     query: str = Field(description="The search query or question to look up")
+    filters: Optional[SearchFilters] = Field(default=None, description="Restrict the search when the query is about a specific file, pages or upload dates")
 
 class BookingAction(BaseModel):
     action_type: Literal["booking"] = "booking"
@@ -47,4 +58,25 @@ class BookingAction(BaseModel):
 class AgentAction(BaseModel):
     tool_name: Literal["search_knowledge_base", "book_interview"] = Field(description="The name of the tool to use")
     reasoning: str = Field(description="Brief explanation of why this tool was chosen")
-    action: Union[SearchAction, BookingAction] = Field(description="The specific action to perform with the tool")
\ No newline at end of file
+    action: Union[SearchAction, BookingAction] = Field(description="The specific action to perform with the tool")
+
+class IngestionProgress(BaseModel):
+    pages_parsed: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+    chunks_skipped: int = 0
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    status: Literal["queued", "parsing", "embedding", "completed", "failed"]
+    file_name: str
+    collection_name: str
+    content_hash: Optional[str] = None
+    size_bytes: Optional[int] = None
+    progress: IngestionProgress
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
@@ -0,0 +1,151 @@
+import logging
+import os
+from typing import Dict, Optional
+from qdrant_client import QdrantClient, models
+
+
+# Profile used for new collections (and by the search parameters of the store)
+QDRANT_COLLECTION_PROFILE = os.getenv("QDRANT_COLLECTION_PROFILE", "balanced").lower()
+
+# Payload fields filtered on by the app, indexed in every profile
+PAYLOAD_INDEXES = {
+    "metadata.embedding_model": models.PayloadSchemaType.KEYWORD,
+    "metadata.file_name": models.PayloadSchemaType.KEYWORD,
+    "metadata.page_no": models.PayloadSchemaType.INTEGER,
+    "metadata.uploaded_at": models.PayloadSchemaType.DATETIME,
+}
+
+
+class CollectionProfile:
+    """
+    Storage and index settings of a hybrid (dense + sparse) collection.
+
+    `quantization` is None, "scalar" (int8, 4x smaller) or "binary" (1 bit
+    per dimension, 32x smaller, best suited to high-dimensional models such
+    as text-embedding-3). Quantized vectors stay in RAM while the originals
+    can live on disk (`vectors_on_disk`). Searches then rescore the top
+    `oversampling * k` quantized candidates against the originals.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        m: int,
+        ef_construct: int,
+        hnsw_ef: int,
+        quantization: Optional[str] = None,
+        oversampling: float = 1.0,
+        vectors_on_disk: bool = False,
+        hnsw_on_disk: bool = False,
+        sparse_on_disk: bool = False,
+        payload_on_disk: bool = False,
+    ):
+        if quantization not in (None, "scalar", "binary"):
+            raise ValueError(f"Unsupported quantization: {quantization}. Use 'scalar', 'binary' or None.")
+        self.name = name
+        self.m = m
+        self.ef_construct = ef_construct
+        self.hnsw_ef = hnsw_ef
+        self.quantization = quantization
+        self.oversampling = oversampling
+        self.vectors_on_disk = vectors_on_disk
+        self.hnsw_on_disk = hnsw_on_disk
+        self.sparse_on_disk = sparse_on_disk
+        self.payload_on_disk = payload_on_disk
+
+    def hnsw_config(self) -> models.HnswConfigDiff:
+        return models.HnswConfigDiff(m=self.m, ef_construct=self.ef_construct, on_disk=self.hnsw_on_disk)
+
+    def quantization_config(self):
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def sparse_vectors_config(self) -> Dict[str, models.SparseVectorParams]:
+        return {"sparse": models.SparseVectorParams(index=models.SparseIndexParams(on_disk=self.sparse_on_disk))}
+
+    def create_collection_kwargs(self, vector_size: int) -> dict:
+        """
+        Keyword arguments of `create_collection` for a collection of this profile.
+        """
+        return {
+            "vectors_config": {
+                "dense": models.VectorParams(
+                    size=vector_size,
+                    distance=models.Distance.COSINE,
+                    on_disk=self.vectors_on_disk,
+                    hnsw_config=self.hnsw_config(),
+                    quantization_config=self.quantization_config(),
+                ),
+            },
+            "sparse_vectors_config": self.sparse_vectors_config(),
+            "on_disk_payload": self.payload_on_disk,
+        }
+
+    def update_collection_kwargs(self) -> dict:
+        """
+        Keyword arguments of `update_collection` that move an existing
+        collection to this profile. Qdrant rebuilds the affected indexes and
+        segments in the background, the collection stays searchable.
+        """
+        return {
+            "vectors_config": {
+                "dense": models.VectorParamsDiff(
+                    on_disk=self.vectors_on_disk,
+                    hnsw_config=self.hnsw_config(),
+                    quantization_config=self.quantization_config() or models.Disabled.DISABLED,
+                ),
+            },
+            "sparse_vectors_config": self.sparse_vectors_config(),
+            "collection_params": models.CollectionParamsDiff(on_disk_payload=self.payload_on_disk),
+        }
+
+    def search_params(self) -> models.SearchParams:
+        quantization = None
+        if self.quantization is not None:
+            quantization = models.QuantizationSearchParams(rescore=True, oversampling=self.oversampling)
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+    def describe(self) -> dict:
+        return dict(vars(self))
+
+
+COLLECTION_PROFILES = {
+    # Everything in RAM, int8 vectors for faster distance computations
+    "latency": CollectionProfile(
+        "latency", m=32, ef_construct=256, hnsw_ef=128, quantization="scalar", oversampling=1.5,
+    ),
+    # int8 vectors in RAM, float32 originals on disk for rescoring
+    "balanced": CollectionProfile(
+        "balanced", m=16, ef_construct=128, hnsw_ef=96, quantization="scalar", oversampling=2.0,
+        vectors_on_disk=True,
+    ),
+    # Binary vectors in RAM, everything else on disk
+    "memory": CollectionProfile(
+        "memory", m=16, ef_construct=100, hnsw_ef=64, quantization="binary", oversampling=3.0,
+        vectors_on_disk=True, hnsw_on_disk=True, sparse_on_disk=True, payload_on_disk=True,
+    ),
+}
+
+
+def get_collection_profile(name: str = QDRANT_COLLECTION_PROFILE) -> CollectionProfile:
+    profile = COLLECTION_PROFILES.get(name.lower())
+    if profile is None:
+        raise ValueError(f"Unknown collection profile: {name}. Use one of {', '.join(COLLECTION_PROFILES)}.")
+    return profile
+
+
+def ensure_payload_indexes(client: QdrantClient, collection_name: str, indexes: Dict = PAYLOAD_INDEXES):
+    """
+    Creates the payload indexes the app filters on. Existing indexes are kept.
+    """
+    existing = client.get_collection(collection_name).payload_schema or {}
+    for field_name, field_schema in indexes.items():
+        if field_name in existing:
+            continue
+        client.create_payload_index(collection_name=collection_name, field_name=field_name, field_schema=field_schema)
+        logging.info(f"Created {field_schema} payload index on {collection_name}.{field_name}")
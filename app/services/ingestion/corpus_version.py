@@ -0,0 +1,89 @@
+import logging
+import threading
+from typing import Callable, Dict, List
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from db.mongodb_instance import AsyncMongoDBInstance
+
+
+# Shared per-collection versions, seen by every API worker
+CORPUS_VERSIONS_COLLECTION = "rag_corpus_versions"
+
+# Per-collection counters bumped whenever new chunks are stored
+_corpus_versions: Dict[str, int] = {}
+# Last shared version read by this process, per collection
+_shared_versions: Dict[str, int] = {}
+_listeners: List[Callable[[str, int], None]] = []
+_lock = threading.Lock()
+
+
+def get_corpus_version(collection_name: str) -> int:
+    """
+    Returns the current in-process version of a collection's corpus.
+    """
+    return _corpus_versions.get(collection_name, 0)
+
+
+def bump_corpus_version(collection_name: str) -> int:
+    """
+    Marks the collection's corpus as changed and notifies the listeners.
+    """
+    with _lock:
+        version = _corpus_versions.get(collection_name, 0) + 1
+        _corpus_versions[collection_name] = version
+        listeners = list(_listeners)
+
+    for listener in listeners:
+        listener(collection_name, version)
+    return version
+
+
+def add_corpus_listener(listener: Callable[[str, int], None]):
+    """
+    Registers `listener(collection_name, version)` to be called on every bump.
+    """
+    with _lock:
+        _listeners.append(listener)
+
+
+async def publish_corpus_change(collection_name: str):
+    """
+    Bumps the collection's shared version in MongoDB, so the other worker
+    processes notice the change on their next `sync_corpus_version`.
+    """
+    try:
+        record = await AsyncMongoDBInstance().get_collection(CORPUS_VERSIONS_COLLECTION).find_one_and_update(
+            {"collection_name": collection_name},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except PyMongoError as e:
+        logging.error(f"Error publishing corpus change of {collection_name}: {e}")
+        return
+    with _lock:
+        _shared_versions[collection_name] = max(_shared_versions.get(collection_name, 0), record["version"])
+
+
+async def sync_corpus_version(collection_name: str) -> int:
+    """
+    Reads the collection's shared version and bumps the local one (notifying
+    the listeners) when another process changed the corpus since the last
+    read. Returns the local version. Falls back to the local version when
+    MongoDB cannot be reached.
+    """
+    try:
+        record = await AsyncMongoDBInstance().get_collection(CORPUS_VERSIONS_COLLECTION).find_one(
+            {"collection_name": collection_name}, {"version": 1, "_id": 0}
+        )
+    except PyMongoError as e:
+        logging.warning(f"Error reading the shared corpus version of {collection_name}: {e}")
+        return get_corpus_version(collection_name)
+
+    shared = (record or {}).get("version", 0)
+    with _lock:
+        seen = _shared_versions.get(collection_name)
+        _shared_versions[collection_name] = max(shared, seen or 0)
+    if seen is not None and shared > seen:
+        bump_corpus_version(collection_name)
+    return get_corpus_version(collection_name)
@@ -0,0 +1,121 @@
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional
+from pymongo.errors import PyMongoError
+from db.mongodb_instance import AsyncMongoDBInstance
+from utils.mongodb_message_builder import get_current_time
+from utils.utils import text_fingerprint
+
+
+REGISTRY_COLLECTION = "rag_document_registry"
+
+# Fixed namespace so document and point ids are stable across processes and releases
+ID_NAMESPACE = uuid.UUID("6f1c2a4e-9b0d-5e8a-a3c7-2d4b8e61f0a9")
+
+
+def make_document_id(collection_name: str, file_name: str) -> str:
+    """
+    Stable id of a source document: the same file name uploaded to the same
+    collection is treated as a new revision of the same document.
+    """
+    return str(uuid.uuid5(ID_NAMESPACE, f"{collection_name}:{file_name}"))
+
+
+def make_chunk_hash(page_content: str, page_no: Optional[int] = None) -> str:
+    """
+    Hash of a chunk's text and page: the same text on two pages gives two
+    chunks, and a chunk that moved to another page is stored again with its
+    new page number.
+    """
+    return text_fingerprint(page_content if page_no is None else f"{page_no}:{page_content}")
+
+
+def make_point_id(document_id: str, chunk_hash: str) -> str:
+    """
+    Deterministic Qdrant point id of a chunk, derived from its content hash.
+    """
+    return str(uuid.uuid5(ID_NAMESPACE, f"{document_id}:{chunk_hash}"))
+
+
+def diff_chunk_hashes(previous: Iterable[str], current: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Compares the chunk hashes of two revisions of a document.
+
+    :return: {"added": [...], "stale": [...], "unchanged": [...]}, each in a
+             stable order
+    """
+    previous = list(dict.fromkeys(previous))
+    current = list(dict.fromkeys(current))
+    previous_set = set(previous)
+    current_set = set(current)
+    return {
+        "added": [h for h in current if h not in previous_set],
+        "stale": [h for h in previous if h not in current_set],
+        "unchanged": [h for h in current if h in previous_set],
+    }
+
+
+class DocumentRegistry:
+    """
+    Keeps one record per ingested document with the content hash of its
+    source file and the hashes of the chunks currently stored for it.
+    """
+
+    def __init__(self, collection_name: str = REGISTRY_COLLECTION):
+        self.collection_name = collection_name
+
+    @staticmethod
+    def _build_record(document_id: str, vector_collection: str, file_name: str,
+                      content_hash: Optional[str], chunk_hashes: List[str]) -> dict:
+        return {
+            "document_id": document_id,
+            "collection_name": vector_collection,
+            "file_name": file_name,
+            "content_hash": content_hash,
+            "chunk_hashes": chunk_hashes,
+            "num_chunks": len(chunk_hashes),
+            "updatedAt": get_current_time(),
+        }
+
+    async def aget(self, document_id: str) -> Optional[dict]:
+        collection = AsyncMongoDBInstance().get_collection(self.collection_name)
+        return await collection.find_one({"document_id": document_id}, {"_id": 0})
+
+    async def asave(self, document_id: str, vector_collection: str, file_name: str,
+                    content_hash: Optional[str], chunk_hashes: List[str]):
+        try:
+            await AsyncMongoDBInstance().get_collection(self.collection_name).update_one(
+                {"document_id": document_id},
+                {
+                    "$set": self._build_record(document_id, vector_collection, file_name, content_hash, chunk_hashes),
+                    "$setOnInsert": {"createdAt": get_current_time()},
+                },
+                upsert=True,
+            )
+        except PyMongoError as e:
+            logging.error(f"Error saving document registry record: {e}")
+            raise Exception(f"Error saving document registry record: {e}")
+
+    async def ais_current(self, document_id: str, content_hash: Optional[str]) -> bool:
+        """
+        True when the document was already ingested from a file with this content hash.
+        """
+        if not content_hash:
+            return False
+        record = await AsyncMongoDBInstance().get_collection(self.collection_name).find_one(
+            {"document_id": document_id}, {"content_hash": 1, "_id": 0}
+        )
+        return bool(record) and record.get("content_hash") == content_hash
+
+
+_document_registry: Optional[DocumentRegistry] = None
+
+
+def get_document_registry() -> DocumentRegistry:
+    """
+    Returns the process-wide document registry.
+    """
+    global _document_registry
+    if _document_registry is None:
+        _document_registry = DocumentRegistry()
+    return _document_registry
@@ -0,0 +1,282 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_qdrant import SparseEmbeddings, SparseVector
+from utils.single_flight import get_single_flight
+from utils.utils import text_fingerprint
+
+
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "agentic_rag_embedding_cache.sqlite3"),
+)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache backed by SQLite.
+
+    Entries are keyed by (model name, kind, normalized text hash), where kind
+    is "document" or "query" since some models embed the two differently.
+    Dense vectors are stored as float32 blobs and sparse vectors as a pair of
+    uint32 index / float32 value blobs. Once the cache holds more than
+    `max_entries` rows, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                indices BLOB,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model, kind, text_hash)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)"
+        )
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, kind: str, text_hashes: List[str]) -> Dict[str, tuple]:
+        """
+        Returns {text_hash: (indices_blob, vector_blob)} for the cached hashes
+        and refreshes their LRU timestamp.
+        """
+        unique_hashes = list(dict.fromkeys(text_hashes))
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique_hashes), 500):
+                batch = unique_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, indices, vector FROM embeddings "
+                    f"WHERE model = ? AND kind = ? AND text_hash IN ({placeholders})",
+                    [model, kind, *batch],
+                ).fetchall()
+                for text_hash, indices, vector in rows:
+                    found[text_hash] = (indices, vector)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE model = ? AND kind = ? AND text_hash = ?",
+                    [(now, model, kind, h) for h in found],
+                )
+                self._conn.commit()
+
+            hits = sum(1 for h in text_hashes if h in found)
+            self.hits += hits
+            self.misses += len(text_hashes) - hits
+        return found
+
+    def put_many(self, model: str, kind: str, entries: Dict[str, tuple]):
+        """
+        Stores {text_hash: (indices_blob, vector_blob)} and evicts the least
+        recently used rows when the cache is over capacity.
+        """
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, kind, text_hash, indices, vector, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(model, kind, h, indices, vector, now) for h, (indices, vector) in entries.items()],
+            )
+            self._size += self._conn.total_changes - before
+            if self._size > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop an extra 10% so eviction does not run on every insert
+        overflow = self._size - self.max_entries + max(1, self.max_entries // 10)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+            (overflow,),
+        )
+        evicted = min(overflow, self._size)
+        self._size -= evicted
+        self.evictions += evicted
+        logging.info(f"Evicted {evicted} entries from the embedding cache")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+def _encode_dense(vector: List[float]) -> tuple:
+    return None, array("f", vector).tobytes()
+
+
+def _decode_dense(entry: tuple) -> List[float]:
+    vector = array("f")
+    vector.frombytes(entry[1])
+    return vector.tolist()
+
+
+def _encode_sparse(vector: SparseVector) -> tuple:
+    return array("I", vector.indices).tobytes(), array("f", vector.values).tobytes()
+
+
+def _decode_sparse(entry: tuple) -> SparseVector:
+    indices, values = array("I"), array("f")
+    indices.frombytes(entry[0])
+    values.frombytes(entry[1])
+    return SparseVector(indices=indices.tolist(), values=values.tolist())
+
+
+def _embed_through_cache(cache, model_name, kind, texts, embed_fn, encode, decode):
+    """
+    Looks every text up in the cache, embeds only the missing (deduplicated)
+    texts with `embed_fn` and writes them back.
+    """
+    hashes = [text_fingerprint(text) for text in texts]
+    cached = cache.get_many(model_name, kind, hashes)
+
+    missing = {}
+    for text, text_hash in zip(texts, hashes):
+        if text_hash not in cached and text_hash not in missing:
+            missing[text_hash] = text
+
+    if missing:
+        vectors = embed_fn(list(missing.values()))
+        fresh = {h: encode(v) for h, v in zip(missing.keys(), vectors)}
+        cache.put_many(model_name, kind, fresh)
+        cached.update(fresh)
+
+    return [decode(cached[h]) for h in hashes]
+
+
+async def _aembed_through_cache(cache, model_name, kind, texts, aembed_fn, encode, decode):
+    hashes = [text_fingerprint(text) for text in texts]
+    cached = await asyncio.to_thread(cache.get_many, model_name, kind, hashes)
+
+    missing = {}
+    for text, text_hash in zip(texts, hashes):
+        if text_hash not in cached and text_hash not in missing:
+            missing[text_hash] = text
+
+    if missing:
+        vectors = await aembed_fn(list(missing.values()))
+        fresh = {h: encode(v) for h, v in zip(missing.keys(), vectors)}
+        await asyncio.to_thread(cache.put_many, model_name, kind, fresh)
+        cached.update(fresh)
+
+    return [decode(cached[h]) for h in hashes]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Dense embedding model wrapper that serves repeated texts from the cache.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return _embed_through_cache(
+            self.cache, self.model_name, "document", texts,
+            self.embeddings.embed_documents, _encode_dense, _decode_dense,
+        )
+
+    def embed_query(self, text: str) -> List[float]:
+        return _embed_through_cache(
+            self.cache, self.model_name, "query", [text],
+            lambda missing: [self.embeddings.embed_query(missing[0])], _encode_dense, _decode_dense,
+        )[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await _aembed_through_cache(
+            self.cache, self.model_name, "document", texts,
+            self.embeddings.aembed_documents, _encode_dense, _decode_dense,
+        )
+
+    async def aembed_query(self, text: str) -> List[float]:
+        async def embed_missing(missing):
+            return [await self.embeddings.aembed_query(missing[0])]
+
+        async def embed():
+            return (await _aembed_through_cache(
+                self.cache, self.model_name, "query", [text],
+                embed_missing, _encode_dense, _decode_dense,
+            ))[0]
+
+        # Identical queries embedded at the same time share one model call
+        return await get_single_flight("query_embedding").do((self.model_name, text_fingerprint(text)), embed)
+
+
+class CachedSparseEmbeddings(SparseEmbeddings):
+    """
+    Sparse (BM25) embedding model wrapper that serves repeated texts from the cache.
+    """
+
+    def __init__(self, sparse_embeddings: SparseEmbeddings, model_name: str, cache: EmbeddingCache):
+        self.sparse_embeddings = sparse_embeddings
+        self.model_name = model_name
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[SparseVector]:
+        return _embed_through_cache(
+            self.cache, self.model_name, "document", texts,
+            self.sparse_embeddings.embed_documents, _encode_sparse, _decode_sparse,
+        )
+
+    def embed_query(self, text: str) -> SparseVector:
+        return _embed_through_cache(
+            self.cache, self.model_name, "query", [text],
+            lambda missing: [self.sparse_embeddings.embed_query(missing[0])], _encode_sparse, _decode_sparse,
+        )[0]
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Returns the process-wide embedding cache.
+    """
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache()
+    return _embedding_cache
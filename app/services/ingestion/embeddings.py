@@ -0,0 +1,118 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from langchain_core.embeddings import Embeddings
+
+
+# Dense embedding backend: "openai" (remote API) or "fastembed" (local ONNX on CPU)
+EMBEDDING_BACKENDS = ("openai", "fastembed")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+DEFAULT_EMBEDDING_MODELS = {
+    "openai": "text-embedding-3-small",
+    "fastembed": "BAAI/bge-small-en-v1.5",
+}
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL") or DEFAULT_EMBEDDING_MODELS.get(EMBEDDING_BACKEND, "")
+# Shortened output vectors, supported by the text-embedding-3 models only
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+# ONNX Runtime threads of the local model (default: all cores) and texts per inference batch
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0")) or None
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+# Native output sizes of the OpenAI embedding models
+OPENAI_EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class FastEmbedDenseEmbeddings(Embeddings):
+    """
+    Local dense embedding model run with FastEmbed (ONNX Runtime) on CPU.
+
+    Texts are embedded in batches of `batch_size`. ONNX Runtime already
+    parallelizes a batch over `threads` cores, so batches run one at a time
+    on a dedicated thread instead of competing with each other.
+    """
+
+    def __init__(self, model_name: str, threads: Optional[int] = None, batch_size: int = EMBEDDING_BATCH_SIZE):
+        from fastembed import TextEmbedding
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = TextEmbedding(model_name=model_name, threads=threads)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dense-embedding")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return [vector.tolist() for vector in self.model.passage_embed(texts, batch_size=self.batch_size)]
+
+    def embed_query(self, text: str) -> List[float]:
+        return next(iter(self.model.query_embed(text))).tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.embed_query, text)
+
+
+def _check_backend(backend: str):
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unsupported embedding backend: {backend}. Use one of {', '.join(EMBEDDING_BACKENDS)}.")
+
+
+def embedding_model_id(model_name: str = EMBEDDING_MODEL, dimensions: Optional[int] = EMBEDDING_DIMENSIONS) -> str:
+    """
+    Name under which vectors of this model are cached and recorded in the
+    points' `embedding_model` metadata. Shortened vectors get their size
+    appended, since they do not mix with full-size ones.
+    """
+    return f"{model_name}@{dimensions}" if dimensions else model_name
+
+
+def embedding_dimension(
+    backend: str = EMBEDDING_BACKEND,
+    model_name: str = EMBEDDING_MODEL,
+    dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+) -> int:
+    """
+    Size of the vectors produced by the model, used to create collections.
+    """
+    _check_backend(backend)
+    if backend == "openai":
+        if dimensions:
+            return dimensions
+        if model_name not in OPENAI_EMBEDDING_DIMENSIONS:
+            raise ValueError(
+                f"Unknown vector size of OpenAI embedding model {model_name}. Set EMBEDDING_DIMENSIONS."
+            )
+        return OPENAI_EMBEDDING_DIMENSIONS[model_name]
+
+    from fastembed import TextEmbedding
+
+    for description in TextEmbedding.list_supported_models():
+        if description["model"].lower() == model_name.lower():
+            return description["dim"]
+    raise ValueError(f"Embedding model {model_name} is not supported by FastEmbed.")
+
+
+def create_dense_embeddings(
+    backend: str = EMBEDDING_BACKEND,
+    model_name: str = EMBEDDING_MODEL,
+    dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+    threads: Optional[int] = EMBEDDING_THREADS,
+) -> Embeddings:
+    """
+    Builds the (uncached) dense embedding model of the configured backend.
+    """
+    _check_backend(backend)
+    if backend == "openai":
+        from langchain_openai import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(model=model_name, dimensions=dimensions, api_key=os.getenv("OPENAI_API_KEY"))
+    if dimensions:
+        raise ValueError("EMBEDDING_DIMENSIONS is only supported by the openai embedding backend.")
+    return FastEmbedDenseEmbeddings(model_name, threads=threads)
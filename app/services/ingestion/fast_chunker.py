@@ -0,0 +1,132 @@
+from typing import Iterable, List
+from langchain_core.documents import Document
+
+
+# Encoding of the OpenAI embedding models
+DEFAULT_ENCODING = "cl100k_base"
+
+
+def normalize_page(text: str) -> str:
+    """
+    Single-pass page normalizer: blank lines are dropped, every line is
+    stripped and whitespace runs inside a line collapse to one space. The
+    splitting runs in C (str.split), which is much cheaper than the regex
+    passes of `clean_page_content`, and its output is left unchanged by
+    `clean_page_content`.
+    """
+    return "\n".join([" ".join(words) for words in map(str.split, text.split("\n")) if words])
+
+
+class FastChunker:
+    """
+    Fused normalize-and-chunk engine behind the "fused" chunking strategy.
+
+    Each page is normalized in one pass (`normalize_page`) and then scanned
+    once for chunk boundaries, so chunks come out already cleaned. Chunks
+    hold at most `chunk_size` units and consecutive chunks share up to
+    `chunk_overlap` units, like RecursiveCharacterTextSplitter. With
+    `length_unit="chars"` a chunk ends at the last line break (or else the
+    last space) inside the window, and the next chunk starts on a word
+    boundary. With `length_unit="tokens"` the page is encoded once with
+    tiktoken and cut into token windows.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        length_unit: str = "chars",
+        encoding_name: str = DEFAULT_ENCODING,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size}), should be smaller."
+            )
+        if length_unit not in ("chars", "tokens"):
+            raise ValueError(f"Unsupported length unit: {length_unit}. Use 'chars' or 'tokens'.")
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.length_unit = length_unit
+        self._encoding = None
+        if length_unit == "tokens":
+            import tiktoken
+
+            self._encoding = tiktoken.get_encoding(encoding_name)
+
+    def split_text(self, text: str) -> List[str]:
+        text = normalize_page(text)
+        if not text:
+            return []
+        if self._encoding is not None:
+            return self._split_tokens(text)
+        return self._split_chars(text)
+
+    def _split_chars(self, text: str) -> List[str]:
+        chunks = []
+        length = len(text)
+        start = 0
+        while start < length:
+            end = start + self.chunk_size
+            if end >= length:
+                end = length
+            else:
+                # Break at the last line break, else the last space, in the
+                # second half of the window; otherwise cut at the window end
+                floor = start + self.chunk_size // 2
+                cut = text.rfind("\n", floor, end + 1)
+                if cut == -1:
+                    cut = text.rfind(" ", floor, end + 1)
+                if cut != -1:
+                    end = cut
+
+            chunk = text[start:end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= length:
+                break
+
+            # Step back by the overlap, then forward to the start of a word
+            next_start = max(end - self.chunk_overlap, start + 1)
+            if next_start < end and not text[next_start - 1].isspace():
+                boundary = self._next_whitespace(text, next_start, end)
+                next_start = boundary + 1 if boundary != -1 else end
+            while next_start < length and text[next_start].isspace():
+                next_start += 1
+            start = next_start
+        return chunks
+
+    @staticmethod
+    def _next_whitespace(text: str, start: int, end: int) -> int:
+        space = text.find(" ", start, end)
+        newline = text.find("\n", start, end)
+        if space == -1:
+            return newline
+        if newline == -1:
+            return space
+        return min(space, newline)
+
+    def _split_tokens(self, text: str) -> List[str]:
+        tokens = self._encoding.encode(text)
+        step = self.chunk_size - self.chunk_overlap
+        chunks = []
+        for start in range(0, len(tokens), step):
+            chunk = self._encoding.decode(tokens[start:start + self.chunk_size]).strip()
+            if chunk:
+                chunks.append(chunk)
+            if start + self.chunk_size >= len(tokens):
+                break
+        return chunks
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        return [
+            Document(page_content=chunk, metadata=dict(document.metadata))
+            for document in documents
+            for chunk in self.split_text(document.page_content)
+        ]
+
+    def length(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return len(text)
+
@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Iterator, List, Optional
+from langchain_core.documents import Document
+from uuid import uuid4
+from services.ingestion.loader import PDF_LOADER_WORKERS, ParallelDocumentLoader
+from services.ingestion.splitter import TextChunker
+from services.ingestion.singleton_wrapper import aget_vector_store
+from services.ingestion.document_registry import get_document_registry, make_document_id
+from utils.mongodb_message_builder import get_current_time
+
+
+# Concurrency limits (overridable through the environment)
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_PARSE_PROCESSES = int(os.getenv("INGESTION_PARSE_PROCESSES", str(PDF_LOADER_WORKERS)))
+INGESTION_MAX_QUEUED_JOBS = int(os.getenv("INGESTION_MAX_QUEUED_JOBS", "100"))
+INGESTION_MAX_TRACKED_JOBS = int(os.getenv("INGESTION_MAX_TRACKED_JOBS", "1000"))
+
+
+class JobQueueFullError(Exception):
+    """Raised when the ingestion queue cannot accept more jobs."""
+
+
+class IngestionJob:
+    def __init__(
+        self,
+        file_path: Path,
+        file_name: str,
+        collection_name: str,
+        content_hash: Optional[str] = None,
+        size_bytes: Optional[int] = None,
+    ):
+        self.job_id = uuid4().hex
+        self.file_path = file_path
+        self.file_name = file_name
+        self.collection_name = collection_name
+        self.content_hash = content_hash
+        self.size_bytes = size_bytes
+        self.status = "queued"
+        self.pages_parsed = 0
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.chunks_upserted = 0
+        self.chunks_skipped = 0
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = get_current_time()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+    def record_progress(self, stage: str, count: int):
+        # Parsing goes on while the first batches are embedded
+        self.status = "embedding"
+        if stage == "embedded":
+            self.chunks_embedded += count
+        elif stage == "upserted":
+            self.chunks_upserted += count
+        elif stage == "skipped":
+            self.chunks_skipped += count
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "file_name": self.file_name,
+            "collection_name": self.collection_name,
+            "content_hash": self.content_hash,
+            "size_bytes": self.size_bytes,
+            "progress": {
+                "pages_parsed": self.pages_parsed,
+                "chunks_total": self.chunks_total,
+                "chunks_embedded": self.chunks_embedded,
+                "chunks_upserted": self.chunks_upserted,
+                "chunks_skipped": self.chunks_skipped,
+            },
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IngestionJobQueue:
+    """
+    Bounded queue of upload ingestion jobs.
+
+    PDF pages are extracted on a shared process pool and streamed through
+    chunking into embedding and upserting, which are driven by a fixed
+    number of async workers.
+
+    The pool's processes are spawned rather than forked, since the app
+    process already holds database clients, model runtimes and threads by
+    the time the first upload arrives. If a worker process dies (e.g. on a
+    malformed PDF), the jobs parsing at that moment fail and the pool is
+    replaced for the jobs after them.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = INGESTION_WORKERS,
+        parse_processes: int = INGESTION_PARSE_PROCESSES,
+        max_queued_jobs: int = INGESTION_MAX_QUEUED_JOBS,
+        max_tracked_jobs: int = INGESTION_MAX_TRACKED_JOBS,
+    ):
+        self.num_workers = num_workers
+        self.parse_processes = parse_processes
+        self.max_tracked_jobs = max_tracked_jobs
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued_jobs)
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._workers: List[asyncio.Task] = []
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.is_running:
+            return
+        self._process_pool = self._new_process_pool()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        logging.info(
+            f"Ingestion queue started with {self.num_workers} workers "
+            f"and {self.parse_processes} parse processes"
+        )
+
+    def _new_process_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.parse_processes, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _replace_broken_pool(self, pool: ProcessPoolExecutor):
+        # Jobs that shared the broken pool all get here, only the first replaces it
+        if self._process_pool is not pool:
+            return
+        logging.warning("Ingestion parse pool broke, starting a new one")
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._process_pool = self._new_process_pool()
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    async def submit(
+        self,
+        file_path: Path,
+        file_name: str,
+        collection_name: str,
+        content_hash: Optional[str] = None,
+        size_bytes: Optional[int] = None,
+    ) -> IngestionJob:
+        if not self.is_running:
+            await self.start()
+
+        job = IngestionJob(file_path, file_name, collection_name, content_hash, size_bytes)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError("Ingestion queue is full, please retry later.")
+
+        self._track(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[IngestionJob]:
+        return list(self._jobs.values())
+
+    def _track(self, job: IngestionJob):
+        self._jobs[job.job_id] = job
+        # Forget the oldest finished jobs once the history is full
+        while len(self._jobs) > self.max_tracked_jobs:
+            oldest_id = next(
+                (jid for jid, j in self._jobs.items() if j.status in ("completed", "failed")),
+                None,
+            )
+            if oldest_id is None:
+                break
+            del self._jobs[oldest_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run_job(job)
+            finally:
+                self._queue.task_done()
+
+    def _iter_chunks(self, job: IngestionJob, loader: ParallelDocumentLoader, first_chunk: dict) -> Iterator[Document]:
+        """
+        Lazily loads, cleans and splits the uploaded file page by page,
+        counting progress on the job. Consumed from a worker thread.
+        """
+        chunker = TextChunker()
+        for page in loader.lazy_load():
+            # The spooled file has a unique prefix, the document is keyed by the uploaded name
+            page.metadata["file_name"] = job.file_name
+            job.pages_parsed += 1
+            for chunk in chunker.iter_split_documents([page]):
+                if not first_chunk:
+                    first_chunk["chunk"] = chunk
+                job.chunks_total += 1
+                yield chunk
+
+    async def _run_job(self, job: IngestionJob):
+        job.started_at = get_current_time()
+        process_pool = self._process_pool
+        try:
+            # An identical re-upload of a known document needs no work at all
+            document_id = make_document_id(job.collection_name, job.file_name)
+            if await get_document_registry().ais_current(document_id, job.content_hash):
+                job.result = {
+                    "filename": job.file_name,
+                    "document_id": document_id,
+                    "collection_name": job.collection_name,
+                    "unchanged": True,
+                }
+                job.status = "completed"
+                return
+
+            # Pages are extracted, split and embedded as a stream, so the
+            # whole file is never held in memory
+            job.status = "parsing"
+            vector_store = await aget_vector_store(job.collection_name)
+            loader = ParallelDocumentLoader(job.file_path, executor=process_pool)
+            first_chunk = {}
+            stored = await vector_store.astore_document_stream(
+                self._iter_chunks(job, loader, first_chunk),
+                progress_callback=job.record_progress,
+                content_hash=job.content_hash,
+                clean=False,
+            )
+
+            job.result = {
+                "filename": job.file_name,
+                "document_id": document_id,
+                "num_documents": job.chunks_total,
+                "preview": first_chunk["chunk"].page_content[:300] if first_chunk else "",
+                "metadata": first_chunk["chunk"].metadata if first_chunk else {},
+                "collection_name": job.collection_name,
+                "chunks_added": stored["num_added"],
+                "chunks_unchanged": stored["num_unchanged"],
+                "chunks_deleted": stored["num_deleted"],
+                "elapsed_seconds": stored["elapsed_seconds"],
+                "chunks_per_second": stored["chunks_per_second"],
+                "extraction": {
+                    key: round(value, 3) if isinstance(value, float) else value
+                    for key, value in loader.stats.get(str(job.file_path), {}).items()
+                },
+            }
+            job.status = "completed"
+        except BrokenProcessPool as e:
+            logging.error(f"Ingestion job {job.job_id} failed: a parse process died: {e}")
+            job.error = f"A parse process died while extracting the file: {e}"
+            job.status = "failed"
+            self._replace_broken_pool(process_pool)
+        except Exception as e:
+            logging.error(f"Ingestion job {job.job_id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = get_current_time()
+            # Clean up uploaded file
+            if job.file_path.exists():
+                job.file_path.unlink()
+
+
+_job_queue: Optional[IngestionJobQueue] = None
+
+
+def get_job_queue() -> IngestionJobQueue:
+    """
+    Returns the process-wide ingestion job queue.
+    """
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = IngestionJobQueue()
+    return _job_queue
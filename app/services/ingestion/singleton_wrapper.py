@@ -1,12 +1,200 @@
 # utils/vector_store_registry.py
-from services.ingestion.vectorstore import LangChainQdrantStore
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, Optional
 
-_vector_store_cache = {}
+if TYPE_CHECKING:
+    from services.ingestion.vectorstore import LangChainQdrantStore
 
-def get_vector_store(collection_name: str) -> LangChainQdrantStore:
+
+VECTOR_STORE_REGISTRY_MAX_COLLECTIONS = int(os.getenv("VECTOR_STORE_REGISTRY_MAX_COLLECTIONS", "32"))
+
+
+class VectorStoreRegistry:
+    """
+    Process-wide registry of LangChainQdrantStore instances.
+
+    All stores share one pair of Qdrant clients, one dense embedding model
+    and one loaded BM25 model. Collections whose existence was already
+    checked are remembered, so creating a store for them costs no round
+    trip. At most `max_collections` stores are kept, the least recently used
+    one is dropped first (its shared clients and models stay loaded).
+
+    The registry lock only guards the store map. Clients, models and stores
+    are built outside of it (one build per collection at a time), so a
+    cache hit never waits for a build. Building blocks on model loading and
+    Qdrant calls: from the event loop, use `aget` and `get_aclient`.
+    """
+
+    def __init__(self, max_collections: int = VECTOR_STORE_REGISTRY_MAX_COLLECTIONS):
+        self.max_collections = max_collections
+        self._stores: "OrderedDict[str, LangChainQdrantStore]" = OrderedDict()
+        self._known_collections = set()
+        self._lock = threading.Lock()
+        self._shared_lock = threading.Lock()
+        self._build_locks = {}
+        self._client = None
+        self._aclient = None
+        self._embedding_model = None
+        self._sparse_model = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.ready = False
+        self.warmup_error: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
+
+    def _ensure_shared(self):
+        # Imported here: langchain_qdrant and qdrant_client are the slowest
+        # imports of the app, keep them off the startup path
+        from services.ingestion.vectorstore import (
+            create_embedding_model,
+            create_qdrant_clients,
+            create_sparse_model,
+        )
+
+        with self._shared_lock:
+            if self._client is None:
+                self._client, self._aclient = create_qdrant_clients()
+            if self._embedding_model is None:
+                self._embedding_model = create_embedding_model()
+            if self._sparse_model is None:
+                self._sparse_model = create_sparse_model()
+
+    @property
+    def aclient(self):
+        """
+        The shared async Qdrant client. Blocking on first use, see `get_aclient`.
+        """
+        if self._aclient is None:
+            self._ensure_shared()
+        return self._aclient
+
+    async def get_aclient(self):
+        if self._aclient is None:
+            await asyncio.to_thread(self._ensure_shared)
+        return self._aclient
+
+    def _cached(self, collection_name: str) -> Optional["LangChainQdrantStore"]:
+        with self._lock:
+            store = self._stores.get(collection_name)
+            if store is not None:
+                self._stores.move_to_end(collection_name)
+                self.hits += 1
+            return store
+
+    def get(self, collection_name: str) -> "LangChainQdrantStore":
+        """
+        Returns the collection's store, building it on a miss. Blocking on a
+        miss (model loading, Qdrant calls), see `aget`.
+        """
+        from services.ingestion.vectorstore import LangChainQdrantStore
+
+        store = self._cached(collection_name)
+        if store is not None:
+            return store
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(collection_name, threading.Lock())
+        with build_lock:
+            # Another thread may have built it while we waited
+            store = self._cached(collection_name)
+            if store is not None:
+                return store
+
+            self._ensure_shared()
+            with self._lock:
+                check_collection = collection_name not in self._known_collections
+            store = LangChainQdrantStore(
+                collection_name,
+                client=self._client,
+                aclient=self._aclient,
+                embedding_model=self._embedding_model,
+                sparse_model=self._sparse_model,
+                check_collection=check_collection,
+            )
+
+            with self._lock:
+                self.misses += 1
+                self._known_collections.add(collection_name)
+                self._stores[collection_name] = store
+                self._build_locks.pop(collection_name, None)
+                while len(self._stores) > self.max_collections:
+                    evicted, _ = self._stores.popitem(last=False)
+                    self.evictions += 1
+                    logging.info(f"Evicted vector store of collection {evicted} from the registry")
+            return store
+
+    async def aget(self, collection_name: str) -> "LangChainQdrantStore":
+        """
+        Like `get`, but builds a missing store in a worker thread so the
+        event loop keeps serving other requests meanwhile.
+        """
+        store = self._cached(collection_name)
+        if store is not None:
+            return store
+        return await asyncio.to_thread(self.get, collection_name)
+
+    def warm_up(self, collection_names: Iterable[str]):
+        """
+        Creates the shared clients and models and the stores of
+        `collection_names` (creating missing collections). Blocking, run it
+        in a thread.
+        """
+        started = time.perf_counter()
+        try:
+            for collection_name in collection_names:
+                self.get(collection_name)
+            self.warmup_seconds = round(time.perf_counter() - started, 3)
+            self.warmup_error = None
+            self.ready = True
+            logging.info(f"Vector store registry warmed up in {self.warmup_seconds}s")
+        except Exception as e:
+            self.warmup_error = str(e)
+            logging.error(f"Vector store registry warm-up failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "collections": list(self._stores),
+            "max_collections": self.max_collections,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "warmup_seconds": self.warmup_seconds,
+            "warmup_error": self.warmup_error,
+        }
+
+
+_registry: Optional[VectorStoreRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_vector_store_registry() -> VectorStoreRegistry:
+    """
+    Returns the process-wide vector store registry.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = VectorStoreRegistry()
+        return _registry
+
+
+def get_vector_store(collection_name: str) -> "LangChainQdrantStore":
+    """
+    Returns the shared LangChainQdrantStore for a given collection.
+    """
+    return get_vector_store_registry().get(collection_name)
+
+
+async def aget_vector_store(collection_name: str) -> "LangChainQdrantStore":
     """
-    Returns a singleton instance of LangChainQdrantStore for a given collection.
+    Returns the shared LangChainQdrantStore for a given collection, without
+    blocking the event loop when it has to be built.
     """
-    if collection_name not in _vector_store_cache:
-        _vector_store_cache[collection_name] = LangChainQdrantStore(collection_name)
-    return _vector_store_cache[collection_name]
+    return await get_vector_store_registry().aget(collection_name)
@@ -1,5 +1,13 @@
+import os
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List
+from typing import Iterable, Iterator, List
+from utils.utils import clean_page_content
+from services.ingestion.fast_chunker import FastChunker
+
+# Strategy used for uploads: "recursive" or "fused"
+CHUNKING_STRATEGY = os.getenv("CHUNKING_STRATEGY", "recursive")
+# Unit of chunk_size/chunk_overlap for the fused strategy: "chars" or "tokens"
+CHUNK_LENGTH_UNIT = os.getenv("CHUNK_LENGTH_UNIT", "chars")
 
 class TextChunker:
     def __init__(
@@ -7,12 +15,16 @@ class TextChunker:
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         separators: List[str] = None,
-        chunking_strategy: str = "recursive",
+        chunking_strategy: str = CHUNKING_STRATEGY,
+        length_unit: str = CHUNK_LENGTH_UNIT,
     ):
         """
-        chunk_size: max characters per chunk
-        chunk_overlap: overlap characters between chunks
+        chunk_size: max characters (or tokens) per chunk
+        chunk_overlap: overlap characters (or tokens) between chunks
         separators: splitting hierarchy; defaults to ["\n\n", "\n", " ", ""]
+        chunking_strategy: "recursive" (RecursiveCharacterTextSplitter) or
+            "fused" (single-pass normalize-and-chunk, chunks come out cleaned)
+        length_unit: "chars" or "tokens", only used by the fused strategy
         """
         
         self.chunking_strategy = chunking_strategy
@@ -27,6 +39,14 @@ class TextChunker:
                 length_function=len,
                 is_separator_regex=False,
             )
+        elif self.chunking_strategy == "fused":
+            self.splitter = FastChunker(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                length_unit=length_unit,
+            )
+        else:
+            raise ValueError(f"Unsupported chunking strategy: {chunking_strategy}")
 
     def split(self, text: str) -> List[str]:
         """Return list of text chunks"""
@@ -44,5 +64,21 @@ class TextChunker:
                 "file_name": orig_metadata.get("file_name", ""),
                 "chunking_strategy": self.chunking_strategy,
                 "page_no": orig_metadata.get("page", 0),            }
+            # How the PDF page was extracted ("full" or "fast"), text files have none
+            if "table_extraction" in orig_metadata:
+                chunk.metadata["table_extraction"] = orig_metadata["table_extraction"]
         return chunked_docs
-        
\ No newline at end of file
+
+    def iter_split_documents(self, documents: Iterable, clean: bool = True) -> Iterator:
+        """
+        Lazily splits the documents one page at a time, yielding each chunk
+        (cleaned with `clean_page_content` when `clean` is set) as soon as its
+        page is split. Produces the same chunks as `split_documents`.
+        """
+        # Fused chunks are already normalized
+        clean = clean and self.chunking_strategy != "fused"
+        for document in documents:
+            for chunk in self.split_documents([document]):
+                if clean:
+                    chunk.page_content = clean_page_content(chunk.page_content)
+                yield chunk
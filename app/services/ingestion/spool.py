@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+from uuid import uuid4
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+# Where uploads are spooled while they wait for ingestion
+UPLOAD_SPOOL_DIR = os.getenv(
+    "UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "agentic_rag_uploads")
+)
+# Size of the buffered writes to the spool file
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE_KB", "1024")) * 1024
+
+
+class UploadError(Exception):
+    """Raised when the multipart upload is malformed or not acceptable."""
+
+
+class UploadTooLargeError(UploadError):
+    """Raised as soon as the streamed upload crosses the size limit."""
+
+
+class SpooledUpload:
+    def __init__(self, path: Path, file_name: str, size_bytes: int, content_hash: str):
+        self.path = path
+        self.file_name = file_name
+        self.size_bytes = size_bytes
+        self.content_hash = content_hash
+
+
+class _FilePartReceiver:
+    """
+    python-multipart callbacks that pick the requested file field out of the
+    body and keep only the bytes not yet flushed to disk.
+    """
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.file_name: Optional[str] = None
+        self.pending = bytearray()
+        self.size_bytes = 0
+        self.hasher = hashlib.sha256()
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file_part = False
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._in_file_part = False
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        name = options.get(b"name", b"").decode("latin-1")
+        file_name = options.get(b"filename")
+        if name == self.field_name and file_name is not None and self.file_name is None:
+            self.file_name = Path(file_name.decode("utf-8", errors="replace")).name
+            self._in_file_part = True
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file_part:
+            chunk = data[start:end]
+            self.size_bytes += len(chunk)
+            self.hasher.update(chunk)
+            self.pending.extend(chunk)
+
+    def on_part_end(self):
+        self._in_file_part = False
+
+
+def _write_chunk(handle, data: bytes):
+    handle.write(data)
+
+
+async def spool_upload(
+    request: Request,
+    max_bytes: int,
+    field_name: str = "file",
+    allowed_suffixes: Tuple[str, ...] = (),
+    spool_dir: str = UPLOAD_SPOOL_DIR,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> SpooledUpload:
+    """
+    Streams a multipart upload straight from the request body to the spool
+    directory in `chunk_size` writes, hashing it in the same pass.
+
+    The upload is rejected as soon as it crosses `max_bytes`, without reading
+    the rest of the body, and the partial spool file is removed.
+    """
+    _, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise UploadError("Expected a multipart/form-data request.")
+
+    # Cheap early rejection when the client announces the size up front
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + chunk_size:
+        raise UploadTooLargeError("Upload exceeds the size limit.")
+
+    receiver = _FilePartReceiver(field_name)
+    parser = MultipartParser(boundary, receiver.callbacks())
+
+    spool_path = Path(spool_dir)
+    spool_path.mkdir(parents=True, exist_ok=True)
+    save_path = spool_path / f"{uuid4().hex}.part"
+
+    try:
+        with open(save_path, "wb") as handle:
+            async for body_chunk in request.stream():
+                parser.write(body_chunk)
+
+                if receiver.file_name is not None and allowed_suffixes:
+                    if not receiver.file_name.lower().endswith(allowed_suffixes):
+                        raise UploadError(
+                            f"Only {', '.join(allowed_suffixes)} files are supported."
+                        )
+                if receiver.size_bytes > max_bytes:
+                    raise UploadTooLargeError("Upload exceeds the size limit.")
+
+                if len(receiver.pending) >= chunk_size:
+                    data = bytes(receiver.pending)
+                    receiver.pending.clear()
+                    await asyncio.to_thread(_write_chunk, handle, data)
+
+            parser.finalize()
+            if receiver.pending:
+                await asyncio.to_thread(_write_chunk, handle, bytes(receiver.pending))
+                receiver.pending.clear()
+
+        if receiver.file_name is None:
+            raise UploadError(f"Missing file field '{field_name}'.")
+
+        # Keep the original name readable while avoiding collisions
+        final_path = spool_path / f"{save_path.stem}_{receiver.file_name}"
+        save_path.rename(final_path)
+    except BaseException:
+        if save_path.exists():
+            save_path.unlink()
+        raise
+
+    return SpooledUpload(
+        path=final_path,
+        file_name=receiver.file_name,
+        size_bytes=receiver.size_bytes,
+        content_hash=receiver.hasher.hexdigest(),
+    )
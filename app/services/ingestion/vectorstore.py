@@ -1,45 +1,237 @@
 from langchain_qdrant import QdrantVectorStore, FastEmbedSparse, RetrievalMode
-from langchain_openai import OpenAIEmbeddings
 from langchain.schema import Document
 from qdrant_client import QdrantClient, AsyncQdrantClient, models
-from qdrant_client.http.models import Distance, VectorParams, SparseVectorParams
-from typing import List
-import uuid
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import time
 import os
+import httpx
+import openai
 from dotenv import load_dotenv
-from utils.mongodb_message_builder import build_metadata_records_from_documents
-from utils.utils import clean_page_content
+from utils.mongodb_message_builder import build_metadata_records_from_documents, get_current_time
+from utils.utils import batched, clean_page_content
 from utils.crud import ConversationStore
+from schemas.schemas import SearchFilters
+from services.ingestion.corpus_version import bump_corpus_version, publish_corpus_change
+from services.ingestion.document_registry import (
+    diff_chunk_hashes,
+    get_document_registry,
+    make_chunk_hash,
+    make_document_id,
+    make_point_id,
+)
+from services.ingestion.embedding_cache import (
+    CachedEmbeddings,
+    CachedSparseEmbeddings,
+    get_embedding_cache,
+)
+from services.ingestion.collection_profiles import (
+    QDRANT_COLLECTION_PROFILE,
+    ensure_payload_indexes,
+    get_collection_profile,
+)
+from services.ingestion.embeddings import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MODEL,
+    create_dense_embeddings,
+    embedding_dimension,
+    embedding_model_id,
+)
 
 
 load_dotenv()
-# Singleton instance
-vector_store_singleton = None
+
+# Async ingestion tuning
+INGESTION_BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "64"))
+INGESTION_EMBED_CONCURRENCY = int(os.getenv("INGESTION_EMBED_CONCURRENCY", "4"))
+INGESTION_UPSERT_CONCURRENCY = int(os.getenv("INGESTION_UPSERT_CONCURRENCY", "2"))
+INGESTION_MAX_RETRIES = int(os.getenv("INGESTION_MAX_RETRIES", "3"))
+INGESTION_RETRY_BASE_DELAY = float(os.getenv("INGESTION_RETRY_BASE_DELAY", "0.5"))
+
+# BM25 sparse vectors are CPU bound, so they get their own threads
+_sparse_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SPARSE_EMBEDDING_THREADS", "2")),
+    thread_name_prefix="sparse-embedding",
+)
+
+_TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+    httpx.TransportError,
+    ResponseHandlingException,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+_TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def _is_transient_error(error: Exception) -> bool:
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code in _TRANSIENT_STATUS_CODES
+    return isinstance(error, _TRANSIENT_ERRORS)
+
+
+async def _with_retries(operation: Callable, description: str, attempts: int = INGESTION_MAX_RETRIES):
+    """
+    Awaits `operation()` and retries it with exponential backoff on transient
+    network, rate-limit and server errors.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == attempts or not _is_transient_error(e):
+                raise
+            delay = INGESTION_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+            logging.warning(f"{description} failed ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        logging.warning(f"Ignoring unparsable date filter: {value}")
+        return None
+
+
+def build_qdrant_filter(filters: Optional[SearchFilters]) -> Optional[models.Filter]:
+    """
+    Turns search filters into a Qdrant filter on the indexed payload fields
+    (file name, page range and upload date), so Qdrant narrows the
+    candidates during the search instead of after it. Pages are 1-based,
+    `metadata.page_no` is 0-based. Returns None when nothing is filtered.
+    """
+    if filters is None:
+        return None
+    conditions = []
+    if filters.file_name:
+        conditions.append(
+            models.FieldCondition(key="metadata.file_name", match=models.MatchValue(value=filters.file_name))
+        )
+    if filters.page_from is not None or filters.page_to is not None:
+        conditions.append(
+            models.FieldCondition(
+                key="metadata.page_no",
+                range=models.Range(
+                    gte=filters.page_from - 1 if filters.page_from is not None else None,
+                    lte=filters.page_to - 1 if filters.page_to is not None else None,
+                ),
+            )
+        )
+    uploaded_after = _parse_datetime(filters.uploaded_after)
+    uploaded_before = _parse_datetime(filters.uploaded_before)
+    if uploaded_after or uploaded_before:
+        conditions.append(
+            models.FieldCondition(
+                key="metadata.uploaded_at",
+                range=models.DatetimeRange(gte=uploaded_after, lte=uploaded_before),
+            )
+        )
+    return models.Filter(must=conditions) if conditions else None
+
+
+SPARSE_MODEL_NAME = "Qdrant/bm25"
+
+
+def create_qdrant_clients() -> Tuple[QdrantClient, AsyncQdrantClient]:
+    """
+    Sync and async clients for the configured (remote) Qdrant instance.
+    """
+    client = QdrantClient(
+        url=os.getenv("QDRANT_HOST_URL"),
+        api_key=os.getenv("QDRANT_API_KEY")
+    )
+    aclient = AsyncQdrantClient(
+        url=os.getenv("QDRANT_HOST_URL"),
+        api_key=os.getenv("QDRANT_API_KEY")
+    )
+    return client, aclient
+
+
+def create_embedding_model(
+    embedding_model_name: str = EMBEDDING_MODEL,
+    embedding_backend: str = EMBEDDING_BACKEND,
+    embedding_dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+) -> CachedEmbeddings:
+    """
+    Dense embedding model of the given backend, served through the persistent embedding cache.
+    """
+    return CachedEmbeddings(
+        create_dense_embeddings(embedding_backend, embedding_model_name, embedding_dimensions),
+        model_name=embedding_model_id(embedding_model_name, embedding_dimensions),
+        cache=get_embedding_cache(),
+    )
+
+
+def create_sparse_model() -> CachedSparseEmbeddings:
+    """
+    BM25 sparse model (loaded from disk), served through the persistent embedding cache.
+    """
+    return CachedSparseEmbeddings(
+        FastEmbedSparse(model_name=SPARSE_MODEL_NAME),
+        model_name=SPARSE_MODEL_NAME,
+        cache=get_embedding_cache(),
+    )
 
 
 class LangChainQdrantStore:
-    def __init__(self, collection_name: str, embedding_model_name: str = "text-embedding-3-small"):
+    """
+    Hybrid (dense + BM25) Qdrant store for one collection.
+
+    Clients and models are created per instance unless shared ones are
+    passed in, which is what the process-wide registry in
+    `singleton_wrapper` does. With `check_collection=False` the collection
+    is assumed to exist with the expected config, skipping the round trips
+    that check (and validate) it. Otherwise a collection created with a
+    different vector size, or holding points of another embedding model, is
+    rejected with a ValueError.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        embedding_model_name: str = EMBEDDING_MODEL,
+        client: Optional[QdrantClient] = None,
+        aclient: Optional[AsyncQdrantClient] = None,
+        embedding_model: Optional[CachedEmbeddings] = None,
+        sparse_model: Optional[CachedSparseEmbeddings] = None,
+        check_collection: bool = True,
+        embedding_backend: str = EMBEDDING_BACKEND,
+        embedding_dimensions: Optional[int] = EMBEDDING_DIMENSIONS,
+        collection_profile: str = QDRANT_COLLECTION_PROFILE,
+    ):
         self.collection_name = collection_name
-        self.embedding_model_name = embedding_model_name
+        # Storage settings of new collections and the matching search parameters
+        self.profile = get_collection_profile(collection_profile)
+        self.search_params = self.profile.search_params()
+        # Recorded in every point's metadata, so mixed collections can be detected
+        self.embedding_model_name = embedding_model_id(embedding_model_name, embedding_dimensions)
+        self.vector_size = embedding_dimension(embedding_backend, embedding_model_name, embedding_dimensions)
         # Set up Qdrant clients (remote)
-        self.client = QdrantClient(
-            url=os.getenv("QDRANT_HOST_URL"),
-            api_key=os.getenv("QDRANT_API_KEY")
-        )
-        self.aclient = AsyncQdrantClient(
-            url=os.getenv("QDRANT_HOST_URL"),
-            api_key=os.getenv("QDRANT_API_KEY")
-        )
+        if client is None or aclient is None:
+            client, aclient = create_qdrant_clients()
+        self.client = client
+        self.aclient = aclient
 
-        # Embedding models
-        self.embedding_model = OpenAIEmbeddings(
-            model=self.embedding_model_name,
-            api_key=os.getenv("OPENAI_API_KEY"),
+        # Embedding models, served through the persistent embedding cache
+        self.embedding_model = embedding_model or create_embedding_model(
+            embedding_model_name, embedding_backend, embedding_dimensions
         )
-        self.sparse_model = FastEmbedSparse(model_name="Qdrant/bm25")
+        self.sparse_model = sparse_model or create_sparse_model()
 
         # Ensure collection exists
-        self._create_collection_if_not_exists()
+        if check_collection:
+            self._create_collection_if_not_exists()
 
         # Create LangChain-compatible vector store
         self.vector_store = QdrantVectorStore(
@@ -50,39 +242,359 @@ class LangChainQdrantStore:
             retrieval_mode=RetrievalMode.HYBRID,
             vector_name="dense",
             sparse_vector_name="sparse",
+            validate_collection_config=check_collection,
         )
 
     def _create_collection_if_not_exists(self):
-        collections = [c.name for c in self.client.get_collections().collections]
-        if self.collection_name not in collections:
+        if not self.client.collection_exists(self.collection_name):
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config={
-                    "dense": VectorParams(size=1536, distance=Distance.COSINE),
-                },
-                sparse_vectors_config={
-                    "sparse": SparseVectorParams(index=models.SparseIndexParams(on_disk=False))
-                }
+                **self.profile.create_collection_kwargs(self.vector_size),
             )
+            # Includes metadata.embedding_model, keeping the mixed-model check below an index lookup
+            ensure_payload_indexes(self.client, self.collection_name)
+            return
+        self._check_embedding_compatibility()
+        # Collections created before an index was added get it now
+        ensure_payload_indexes(self.client, self.collection_name)
 
-    def store_documents(self, documents: List[Document]) -> List[str]:
+    def _check_embedding_compatibility(self):
         """
-        Stores LangChain Document chunks in the vector store.
+        Rejects an existing collection whose dense vectors were made by another
+        embedding model: searching it with this one would return noise.
         """
-        ids = [str(uuid.uuid4()) for _ in documents]
+        vectors = self.client.get_collection(self.collection_name).config.params.vectors
+        dense = vectors.get("dense") if isinstance(vectors, dict) else None
+        if dense is not None and dense.size != self.vector_size:
+            raise ValueError(
+                f"Collection {self.collection_name} stores {dense.size}-dimensional vectors, but embedding "
+                f"model {self.embedding_model_name} produces {self.vector_size}. Use another collection "
+                f"or the embedding model the collection was built with."
+            )
+
+        # Any point tagged with a different embedding model
+        foreign_points, _ = self.client.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=models.Filter(
+                must_not=[
+                    models.IsEmptyCondition(is_empty=models.PayloadField(key="metadata.embedding_model")),
+                    models.FieldCondition(
+                        key="metadata.embedding_model",
+                        match=models.MatchValue(value=self.embedding_model_name),
+                    ),
+                ]
+            ),
+            limit=1,
+            with_payload=["metadata.embedding_model"],
+            with_vectors=False,
+        )
+        if foreign_points:
+            other_model = foreign_points[0].payload.get("metadata", {}).get("embedding_model")
+            raise ValueError(
+                f"Collection {self.collection_name} holds points embedded with {other_model}, "
+                f"not {self.embedding_model_name}. Re-ingest it or use another collection."
+            )
+
+    def _prepare_documents(
+        self, documents: List[Document], seen: Optional[set] = None, clean: bool = True,
+        uploaded_at: Optional[str] = None,
+    ) -> Tuple[List[str], List[Document]]:
+        """
+        Cleans the chunks in place, tags them with the embedding model, their
+        document id, content hash and upload time, and returns their
+        deterministic point ids. Chunks repeating the text and page of an
+        earlier chunk of the same document (tracked across calls through
+        `seen`) are dropped, since they would map to the same point.
+        """
+        seen = set() if seen is None else seen
+        ids = []
+        unique_documents = []
         for doc in documents:
-            doc.page_content = clean_page_content(doc.page_content)  # Clean page content
+            if clean:
+                doc.page_content = clean_page_content(doc.page_content)  # Clean page content
+            document_id = make_document_id(self.collection_name, doc.metadata.get("file_name", ""))
+            chunk_hash = make_chunk_hash(doc.page_content, doc.metadata.get("page_no"))
+            point_id = make_point_id(document_id, chunk_hash)
+            if point_id in seen:
+                continue
+            seen.add(point_id)
             doc.metadata = {
                 **doc.metadata,
                 "embedding_model": self.embedding_model_name,
+                "document_id": document_id,
+                "chunk_hash": chunk_hash,
+                "uploaded_at": uploaded_at or get_current_time(),
             }
-            
-        conversation_store = ConversationStore(collection_name="rag_upload_metadata_info")
-        conversation_store.get_collection().insert_many(
-            build_metadata_records_from_documents(documents)
+            ids.append(point_id)
+            unique_documents.append(doc)
+        return ids, unique_documents
+
+    @staticmethod
+    def _stale_point_ids(stale: Dict[str, List[str]]) -> List[str]:
+        return [
+            make_point_id(document_id, chunk_hash)
+            for document_id, chunk_hashes in stale.items()
+            for chunk_hash in chunk_hashes
+        ]
+
+    async def _delete_unregistered_chunks(self, document_id: str, file_name: str, metadata_store: ConversationStore):
+        """
+        Deletes the chunks of `file_name` stored before the document registry
+        existed. They have random point ids and no `document_id`, so the
+        chunk diff cannot see them.
+        """
+        await _with_retries(
+            lambda: self.aclient.delete(
+                collection_name=self.collection_name,
+                points_selector=models.FilterSelector(filter=models.Filter(
+                    must=[models.FieldCondition(
+                        key=f"{QdrantVectorStore.METADATA_KEY}.file_name", match=models.MatchValue(value=file_name),
+                    )],
+                    must_not=[models.FieldCondition(
+                        key=f"{QdrantVectorStore.METADATA_KEY}.document_id", match=models.MatchValue(value=document_id),
+                    )],
+                )),
+                wait=True,
+            ),
+            "Qdrant delete of unregistered chunks",
+        )
+        await metadata_store.delete_unregistered_metadata_records(file_name)
+
+    async def astore_documents(
+        self,
+        documents: List[Document],
+        batch_size: int = INGESTION_BATCH_SIZE,
+        embed_concurrency: int = INGESTION_EMBED_CONCURRENCY,
+        upsert_concurrency: int = INGESTION_UPSERT_CONCURRENCY,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        content_hash: Optional[str] = None,
+    ) -> dict:
+        """
+        Stores a list of LangChain Document chunks, see `astore_document_stream`.
+        """
+        return await self.astore_document_stream(
+            documents,
+            batch_size=batch_size,
+            embed_concurrency=embed_concurrency,
+            upsert_concurrency=upsert_concurrency,
+            progress_callback=progress_callback,
+            content_hash=content_hash,
         )
-        
-        return self.vector_store.add_documents(documents, ids=ids)
+
+    async def astore_document_stream(
+        self,
+        chunks: Iterable[Document],
+        batch_size: int = INGESTION_BATCH_SIZE,
+        embed_concurrency: int = INGESTION_EMBED_CONCURRENCY,
+        upsert_concurrency: int = INGESTION_UPSERT_CONCURRENCY,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        content_hash: Optional[str] = None,
+        clean: bool = True,
+    ) -> dict:
+        """
+        Stores LangChain Document chunks through the async Qdrant client.
+
+        `chunks` may be any iterable, typically a lazy load -> split
+        generator. It is consumed `batch_size` chunks at a time on a worker
+        thread, and no new batch is pulled while `embed_concurrency +
+        upsert_concurrency` batches are still in flight, so memory stays
+        flat however large the document is. Dense embeddings run with at
+        most `embed_concurrency` requests in flight, BM25 vectors are
+        computed on a thread pool, and every batch is upserted on its own task,
+        so embedding of the next batch overlaps the upsert of the previous one.
+        `progress_callback(stage, count)` is called with stage "embedded" or
+        "upserted" after every batch, and "skipped" for unchanged chunks.
+
+        Documents are diffed against the document registry: only new or
+        changed chunks are embedded and upserted, and the points and metadata
+        of chunks that disappeared are deleted. Only the chunk hashes are kept
+        for that diff. A document without a registry record also loses the
+        chunks stored for its file name before the registry existed. `content_hash` (the hash of the source file, when all
+        chunks come from one file) is recorded so an identical re-upload can
+        be skipped before parsing. Pass `clean=False` for chunks already
+        cleaned with `clean_page_content`.
+
+        Every write waits until Qdrant has applied it, so the corpus version
+        is only bumped once searches see the new points.
+        """
+        started = time.perf_counter()
+        uploaded_at = get_current_time()
+        loop = asyncio.get_running_loop()
+        embed_semaphore = asyncio.Semaphore(embed_concurrency)
+        upsert_semaphore = asyncio.Semaphore(upsert_concurrency)
+        in_flight = asyncio.Semaphore(embed_concurrency + upsert_concurrency)
+        registry = get_document_registry()
+        metadata_store = ConversationStore(collection_name="rag_upload_metadata_info")
+
+        # document_id -> hashes stored by the previous ingestion / seen in this one
+        previous_hashes: Dict[str, set] = {}
+        # documents without a registry record, stored for the first time since the registry exists
+        unregistered: List[str] = []
+        current_hashes: Dict[str, List[str]] = {}
+        file_names: Dict[str, str] = {}
+        seen = set()
+        ids: List[str] = []
+        unchanged_ids: List[str] = []
+        counts = {"added": 0, "unchanged": 0, "batches": 0}
+        tasks: List[asyncio.Task] = []
+        chunk_batches = batched(chunks, batch_size)
+
+        def report(stage: str, count: int):
+            if progress_callback:
+                progress_callback(stage, count)
+
+        async def process_batch(batch_ids: List[str], batch_docs: List[Document]):
+            try:
+                texts = [doc.page_content for doc in batch_docs]
+                async with embed_semaphore:
+                    dense_vectors, sparse_vectors = await asyncio.gather(
+                        _with_retries(
+                            lambda: self.embedding_model.aembed_documents(texts),
+                            "Dense embedding batch",
+                        ),
+                        loop.run_in_executor(_sparse_executor, self.sparse_model.embed_documents, texts),
+                    )
+                report("embedded", len(batch_docs))
+
+                points = [
+                    models.PointStruct(
+                        id=point_id,
+                        vector={
+                            "dense": dense,
+                            "sparse": models.SparseVector(indices=sparse.indices, values=sparse.values),
+                        },
+                        payload={
+                            QdrantVectorStore.CONTENT_KEY: doc.page_content,
+                            QdrantVectorStore.METADATA_KEY: doc.metadata,
+                        },
+                    )
+                    for point_id, doc, dense, sparse in zip(batch_ids, batch_docs, dense_vectors, sparse_vectors)
+                ]
+                async with upsert_semaphore:
+                    await _with_retries(
+                        lambda: self.aclient.upsert(
+                            collection_name=self.collection_name, points=points, wait=True
+                        ),
+                        "Qdrant upsert batch",
+                    )
+                await metadata_store.store_metadata_records(
+                    build_metadata_records_from_documents(batch_docs, batch_ids)
+                )
+                report("upserted", len(batch_docs))
+            finally:
+                in_flight.release()
+
+        try:
+            while True:
+                await in_flight.acquire()
+                batch = await asyncio.to_thread(next, chunk_batches, None)
+                if batch is None:
+                    in_flight.release()
+                    break
+
+                batch_ids, batch = self._prepare_documents(batch, seen=seen, clean=clean, uploaded_at=uploaded_at)
+                ids.extend(batch_ids)
+
+                new_document_ids = list(dict.fromkeys(
+                    doc.metadata["document_id"] for doc in batch
+                    if doc.metadata["document_id"] not in previous_hashes
+                ))
+                records = await asyncio.gather(*(registry.aget(document_id) for document_id in new_document_ids))
+                for document_id, record in zip(new_document_ids, records):
+                    previous_hashes[document_id] = set((record or {}).get("chunk_hashes", []))
+                    if record is None:
+                        unregistered.append(document_id)
+
+                to_store_ids, to_store = [], []
+                for point_id, doc in zip(batch_ids, batch):
+                    document_id = doc.metadata["document_id"]
+                    file_names.setdefault(document_id, doc.metadata.get("file_name", ""))
+                    current_hashes.setdefault(document_id, []).append(doc.metadata["chunk_hash"])
+                    if doc.metadata["chunk_hash"] in previous_hashes[document_id]:
+                        counts["unchanged"] += 1
+                        unchanged_ids.append(point_id)
+                    else:
+                        to_store_ids.append(point_id)
+                        to_store.append(doc)
+
+                if len(batch) > len(to_store):
+                    report("skipped", len(batch) - len(to_store))
+                if not to_store:
+                    in_flight.release()
+                    continue
+
+                counts["added"] += len(to_store)
+                counts["batches"] += 1
+                tasks.append(asyncio.create_task(process_batch(to_store_ids, to_store)))
+                # Surface a failed batch right away instead of at the end of the stream
+                for task in tasks:
+                    if task.done() and task.exception():
+                        raise task.exception()
+                tasks = [task for task in tasks if not task.done()]
+
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        # Unchanged chunks keep their points, only their upload time moves on
+        for id_batch in batched(unchanged_ids, batch_size):
+            await _with_retries(
+                lambda: self.aclient.set_payload(
+                    collection_name=self.collection_name,
+                    payload={"uploaded_at": uploaded_at},
+                    points=id_batch,
+                    key=QdrantVectorStore.METADATA_KEY,
+                    wait=True,
+                ),
+                "Qdrant upload time update",
+            )
+
+        stale = {}
+        for document_id, previous in previous_hashes.items():
+            stale_hashes = diff_chunk_hashes(previous, current_hashes[document_id])["stale"]
+            if stale_hashes:
+                stale[document_id] = stale_hashes
+        stale_ids = self._stale_point_ids(stale)
+        if stale_ids:
+            await _with_retries(
+                lambda: self.aclient.delete(
+                    collection_name=self.collection_name,
+                    points_selector=models.PointIdsList(points=stale_ids),
+                    wait=True,
+                ),
+                "Qdrant delete of stale chunks",
+            )
+            await asyncio.gather(*(
+                metadata_store.delete_metadata_records(document_id, chunk_hashes)
+                for document_id, chunk_hashes in stale.items()
+            ))
+
+        for document_id in unregistered:
+            await self._delete_unregistered_chunks(document_id, file_names[document_id], metadata_store)
+
+        await asyncio.gather(*(
+            registry.asave(
+                document_id, self.collection_name, file_names[document_id], content_hash, hashes,
+            )
+            for document_id, hashes in current_hashes.items()
+        ))
+        if counts["added"] or stale_ids:
+            bump_corpus_version(self.collection_name)
+            await publish_corpus_change(self.collection_name)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "ids": ids,
+            "num_chunks": len(ids),
+            "num_added": counts["added"],
+            "num_unchanged": counts["unchanged"],
+            "num_deleted": len(stale_ids),
+            "num_batches": counts["batches"],
+            "elapsed_seconds": round(elapsed, 3),
+            "chunks_per_second": round(counts["added"] / elapsed, 2) if elapsed > 0 else 0.0,
+        }
 
     def search(self, query: str, k: int = 5) -> List[Document]:
         """
@@ -90,5 +602,51 @@ class LangChainQdrantStore:
         """
         return self.vector_store.similarity_search(query=query, k=k)
 
-    def search_with_scores(self, query: str, k: int = 5):
-        return self.vector_store.similarity_search_with_score(query=query, k=k)
+    def search_with_scores(self, query: str, k: int = 5, filters: Optional[SearchFilters] = None):
+        return self.vector_store.similarity_search_with_score(
+            query=query, k=k, filter=build_qdrant_filter(filters), search_params=self.search_params
+        )
+
+    async def asearch_with_scores(self, query: str, k: int = 5, filters: Optional[SearchFilters] = None):
+        """
+        Async hybrid search: embeds the query without blocking the event loop
+        and fuses the dense and sparse hits with RRF through the async client,
+        mirroring `search_with_scores`. `filters` are applied to both
+        prefetches, inside the index search.
+        """
+        query_filter = build_qdrant_filter(filters)
+        loop = asyncio.get_running_loop()
+        dense_query, sparse_query = await asyncio.gather(
+            self.embedding_model.aembed_query(query),
+            loop.run_in_executor(_sparse_executor, self.sparse_model.embed_query, query),
+        )
+        response = await self.aclient.query_points(
+            collection_name=self.collection_name,
+            prefetch=[
+                models.Prefetch(
+                    using="dense", query=dense_query, filter=query_filter, limit=k, params=self.search_params
+                ),
+                models.Prefetch(
+                    using="sparse",
+                    query=models.SparseVector(indices=sparse_query.indices, values=sparse_query.values),
+                    filter=query_filter,
+                    limit=k,
+                ),
+            ],
+            query=models.FusionQuery(fusion=models.Fusion.RRF),
+            limit=k,
+            with_payload=True,
+            with_vectors=False,
+        )
+        return [
+            (
+                QdrantVectorStore._document_from_point(
+                    point,
+                    self.collection_name,
+                    QdrantVectorStore.CONTENT_KEY,
+                    QdrantVectorStore.METADATA_KEY,
+                ),
+                point.score,
+            )
+            for point in response.points
+        ]
@@ -1,32 +1,65 @@
-import os
+import asyncio
+import time
 from langgraph.graph import StateGraph
-from langchain_openai import ChatOpenAI, OpenAI
+from langgraph.config import get_stream_writer
 from langchain_core.prompts import PromptTemplate
 from schemas.schemas import AgentState, AgentAction
-from .tools import search_knowledge_base, book_interview
+from .tools import asearch_knowledge_base, book_interview
+from .router import get_fast_path_router, ROUTER_ENABLED
 from utils.crud import ConversationStore
 from utils.mongodb_message_builder import build_booking_record
-from dotenv import load_dotenv
+from .llm import get_llm, get_synth_llm
+from .context_packer import pack_context
+from .reranker import RERANK_CANDIDATES, RERANK_ENABLED, RERANK_TOP_N, rerank_or_truncate
+from .speculation import SPECULATIVE_RETRIEVAL, get_speculative_retrieval, queries_match
 
-load_dotenv()
-
-# LangSmith setup
-os.environ["LANGCHAIN_API_KEY"] = os.getenv("LANGCHAIN_API_KEY")
-os.environ["LANGCHAIN_TRACING_V2"] = "true"
-os.environ["LANGCHAIN_PROJECT"] = "agentic_rag"
-
-# Tool mapping
+# Tool mapping (async variants where available; sync tools run in an executor)
 TOOL_MAP = {
-    "search_knowledge_base": search_knowledge_base,
+    "search_knowledge_base": asearch_knowledge_base,
     "book_interview": book_interview
 }
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, api_key=os.getenv('OPENAI_API_KEY'))
-synth_llm = OpenAI(model="gpt-4o-mini", temperature=0)
 
+def search_tool_input(tool_input: dict) -> dict:
+    if RERANK_ENABLED:
+        # Over-fetch, the rerank node keeps the best RERANK_TOP_N
+        return {**tool_input, "k": RERANK_CANDIDATES}
+    return tool_input
+
+
+async def resolve_speculation(state: AgentState, task) -> AgentState:
+    """
+    Reuses the speculative retrieval when the router chose to search for
+    the unchanged, unfiltered user input; otherwise stops it.
+    """
+    speculation = get_speculative_retrieval()
+    tool_input = state.get("tool_input") or {}
+    if state.get("selected_tool") != "search_knowledge_base":
+        await speculation.cancel(task)
+    elif tool_input.get("filters") or not queries_match(state["user_input"], tool_input.get("query", "")):
+        await speculation.discard(task)
+    else:
+        state["speculative_output"] = await speculation.take(task)
+    return state
+
+
+async def process_user_input(state: AgentState, speculative: bool = False):
+    # Confidently-search queries skip the LLM classification call
+    router = get_fast_path_router()
+    if ROUTER_ENABLED and router.route(state["user_input"], has_history=bool(state.get("chat_history"))):
+        state["selected_tool"] = "search_knowledge_base"
+        state["tool_input"] = {"query": state["user_input"]}
+        print(f"Selected tool: search_knowledge_base - local fast-path router")
+        return state
 
-async def process_user_input(state: AgentState):
-    structured_llm = llm.with_structured_output(AgentAction)
+    # Search the raw input while the LLM decides, most traffic is search
+    speculation_task = None
+    if speculative:
+        speculation_task = get_speculative_retrieval().start(
+            asearch_knowledge_base.ainvoke(search_tool_input({"query": state["user_input"]}))
+        )
+
+    structured_llm = get_llm().with_structured_output(AgentAction)
     prompt = PromptTemplate.from_template("""
     You are an intelligent agent that can perform two types of actions:
 
@@ -40,6 +73,9 @@ async def process_user_input(state: AgentState):
     Now analyze the latest query:
     User Query: {input}
 
+    For searches that are clearly about a specific file, page range or upload date,
+    fill in the search filters; otherwise leave them empty.
+
     Respond with:
     - The tool name
     - Reasoning
@@ -50,9 +86,14 @@ async def process_user_input(state: AgentState):
         chat_history_text = "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in state.get("chat_history", []))
         result = await structured_llm.ainvoke(prompt.format(input=state["user_input"], history=chat_history_text), config={"run_name": "process_user_input"})
         state["selected_tool"] = result.tool_name
+        # Log the decision so the fast-path router can be retrained on it
+        await asyncio.to_thread(router.record, state["user_input"], result.tool_name)
 
         if result.action.action_type == "search":
             state["tool_input"] = {"query": result.action.query}
+            filters = result.action.filters.model_dump(exclude_none=True) if result.action.filters else {}
+            if filters:
+                state["tool_input"]["filters"] = filters
         elif result.action.action_type == "booking":
             state["tool_input"] = {
                 "receiver_email": result.action.receiver_email,
@@ -60,8 +101,11 @@ async def process_user_input(state: AgentState):
                 "appointment_date": result.action.appointment_date,
                 "appointment_time": result.action.appointment_time
             }
+            if speculation_task is not None:
+                await get_speculative_retrieval().cancel(speculation_task)
+                speculation_task = None
             booking_store = ConversationStore(collection_name="booking_interview")
-            booking_store.save_booking(
+            await booking_store.save_booking(
                 build_booking_record(
                     username=result.action.user_name,
                     email=result.action.receiver_email,
@@ -79,14 +123,28 @@ async def process_user_input(state: AgentState):
         state["tool_input"] = {"query": state["user_input"]}
         print(f"Fallback to search due to error: {str(e)}")
 
+    if speculation_task is not None:
+        state = await resolve_speculation(state, speculation_task)
     return state
 
-def run_tool(state: AgentState):
+
+async def process_user_input_speculative(state: AgentState):
+    return await process_user_input(state, speculative=True)
+
+async def run_tool(state: AgentState):
     print(f"Running tool: {state['selected_tool']} with input: {state['tool_input']}")
     tool_func = TOOL_MAP.get(state["selected_tool"])
     if tool_func:
+        tool_input = state["tool_input"]
+        if state["selected_tool"] == "search_knowledge_base":
+            if state.get("speculative_output") is not None:
+                # Retrieved while the router was deciding
+                state["tool_output"] = state["speculative_output"]
+                state["speculative_output"] = None
+                return state
+            tool_input = search_tool_input(tool_input)
         try:
-            result = tool_func.invoke(state["tool_input"])
+            result = await tool_func.ainvoke(tool_input)
             state["tool_output"] = result
         except Exception as e:
             state["tool_output"] = f"Error executing tool: {str(e)}"
@@ -94,6 +152,19 @@ def run_tool(state: AgentState):
         state["tool_output"] = f"Unknown tool: {state['selected_tool']}"
     return state
 
+async def rerank_search_results(state: AgentState):
+    docs = state.get("tool_output")
+    if state["selected_tool"] != "search_knowledge_base" or not isinstance(docs, list):
+        return state
+
+    started = time.perf_counter()
+    state["tool_output"] = await rerank_or_truncate(state["user_input"], docs, RERANK_TOP_N)
+    state["timings"] = {
+        **(state.get("timings") or {}),
+        "rerank_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    return state
+
 async def synthesize_search_results(state: AgentState):
     if state['selected_tool'] == "search_knowledge_base":
         docs = state.get("tool_output", [])
@@ -101,8 +172,14 @@ async def synthesize_search_results(state: AgentState):
             state["tool_output"] = "No relevant information found in the knowledge base."
             return state
 
-        # docs is expected to be List[Document]
-        combined_text = "\n\n".join([doc.page_content for doc, _ in docs])
+        # docs is expected to be List[Tuple[Document, score]]; overlapping chunks
+        # are merged and the context is capped at SYNTH_CONTEXT_TOKEN_BUDGET tokens
+        context = pack_context(docs)
+        combined_text = context["text"]
+        print(
+            f"Packed {context['chunks']} chunks into {context['blocks_used']}/{context['blocks']} blocks, "
+            f"{context['tokens']} tokens"
+        )
         query = state.get("user_input", "")
 
         prompt = f"""
@@ -118,7 +195,12 @@ Documents:
 Answer:
 """
 
-        answer = await synth_llm.ainvoke(prompt, max_tokens=2048, config={"run_name": "synthesize_search_results"})
+        # Stream the completion so graph.astream(stream_mode="custom") callers get tokens as they arrive
+        writer = get_stream_writer()
+        answer = ""
+        async for token in get_synth_llm().astream(prompt, max_tokens=2048, config={"run_name": "synthesize_search_results"}):
+            answer += token
+            writer({"token": token})
         state["tool_output"] = answer
     return state
 
@@ -134,16 +216,26 @@ def postprocess_tool_output(state: AgentState):
     # You can add more tool-specific postprocessing here if needed
     return state
 
-def get_graph():
+def get_graph(speculative: bool = SPECULATIVE_RETRIEVAL):
+    """
+    With `speculative`, hybrid retrieval on the raw user input runs
+    concurrently with the LLM routing call and is reused when the router
+    picks search with an unchanged query.
+    """
     builder = StateGraph(AgentState)
-    builder.add_node("process_input", process_user_input)
+    builder.add_node("process_input", process_user_input_speculative if speculative else process_user_input)
     builder.add_node("run_tool", run_tool)
     builder.add_node("synthesize", synthesize_search_results)
     builder.add_node("postprocess", postprocess_tool_output)
 
     builder.set_entry_point("process_input")
     builder.add_edge("process_input", "run_tool")
-    builder.add_edge("run_tool", "synthesize")
+    if RERANK_ENABLED:
+        builder.add_node("rerank", rerank_search_results)
+        builder.add_edge("run_tool", "rerank")
+        builder.add_edge("rerank", "synthesize")
+    else:
+        builder.add_edge("run_tool", "synthesize")
     builder.add_edge("synthesize", "postprocess")
     builder.set_finish_point("postprocess")
 
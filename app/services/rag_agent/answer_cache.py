@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+import numpy as np
+from services.ingestion.corpus_version import add_corpus_listener, get_corpus_version, sync_corpus_version
+from services.ingestion.singleton_wrapper import aget_vector_store
+from services.rag_agent.tools import COLLECTION_NAME
+
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.95"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+
+
+class SemanticAnswerCache:
+    """
+    In-process semantic cache of (query embedding -> answer) pairs.
+
+    Lookups compare the query embedding against every cached one with a
+    single matrix-vector product and return the best answer whose cosine
+    similarity reaches `threshold`. Entries expire after `ttl_seconds`, the
+    least recently used entry is dropped once `max_entries` is reached, and
+    the whole cache is cleared whenever new chunks are stored in
+    `collection_name`. The cache lives in the API process, so each worker
+    keeps its own copy. Uploads handled by another worker are noticed
+    through the shared corpus version in MongoDB, read on every lookup and
+    store (see `sync_corpus_version`).
+
+    Entries are keyed by the query alone, so only questions asked without
+    chat history may be looked up or stored.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        embed_query: Callable[[str], Awaitable[List[float]]],
+        threshold: float = ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+    ):
+        self.collection_name = collection_name
+        self.embed_query = embed_query
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        # Unit-norm embeddings, one row per slot, allocated on the first store
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        # slot -> entry, in least-recently-used-first order
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+
+        add_corpus_listener(self._on_corpus_changed)
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    async def lookup(self, query: str) -> Optional[str]:
+        """
+        Returns a cached answer for a semantically equivalent query, if any.
+        """
+        corpus_version = await self.sync_corpus_version()
+        if not self._entries:
+            self.misses += 1
+            return None
+
+        vector = self._normalize(await self.embed_query(query))
+        with self._lock:
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            scores = self._matrix @ vector
+            scores[~self._valid] = -np.inf
+            slot = int(np.argmax(scores))
+            entry = self._entries.get(slot)
+
+            if entry is None or scores[slot] < self.threshold:
+                self.misses += 1
+                return None
+
+            expired = time.monotonic() - entry["created_at"] > self.ttl_seconds
+            if expired or entry["corpus_version"] != corpus_version:
+                self._release(slot)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(slot)
+            self.hits += 1
+            return entry["answer"]
+
+    def corpus_version(self) -> int:
+        return get_corpus_version(self.collection_name)
+
+    async def sync_corpus_version(self) -> int:
+        """
+        The corpus version, after catching up with changes made by other workers.
+        """
+        return await sync_corpus_version(self.collection_name)
+
+    async def store(self, query: str, answer: str, corpus_version: Optional[int] = None):
+        """
+        Caches the answer. Pass the `corpus_version` seen before the answer
+        was computed so answers racing with an upload are not cached.
+        """
+        if corpus_version is None:
+            corpus_version = self.corpus_version()
+        vector = self._normalize(await self.embed_query(query))
+        await self.sync_corpus_version()
+        with self._lock:
+            if corpus_version != self.corpus_version():
+                return
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            if not self._free_slots:
+                # Evict the least recently used entry
+                self._release(next(iter(self._entries)))
+
+            slot = self._free_slots.pop()
+            self._matrix[slot] = vector
+            self._valid[slot] = True
+            self._entries[slot] = {
+                "query": query,
+                "answer": answer,
+                "created_at": time.monotonic(),
+                "corpus_version": corpus_version,
+            }
+
+    def _release(self, slot: int):
+        self._entries.pop(slot, None)
+        self._valid[slot] = False
+        self._free_slots.append(slot)
+
+    def clear(self):
+        with self._lock:
+            for slot in list(self._entries):
+                self._release(slot)
+
+    def _on_corpus_changed(self, collection_name: str, version: int):
+        if collection_name == self.collection_name:
+            self.clear()
+            self.invalidations += 1
+            logging.info(f"Answer cache cleared after corpus update of {collection_name}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": ANSWER_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "similarity_threshold": self.threshold,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+_answer_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    """
+    Returns the process-wide answer cache for the knowledge base collection.
+    """
+    global _answer_cache
+    if _answer_cache is None:
+        async def embed_query(query: str) -> List[float]:
+            return await (await aget_vector_store(COLLECTION_NAME)).embedding_model.aembed_query(query)
+
+        _answer_cache = SemanticAnswerCache(COLLECTION_NAME, embed_query)
+    return _answer_cache
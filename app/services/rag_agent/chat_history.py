@@ -1,41 +1,100 @@
+import asyncio
+import logging
+from typing import Dict
 from utils.crud import ConversationStore
 import os
-from services.rag_agent.agent_graph import synth_llm
+from services.rag_agent.llm import get_synth_llm
 
-def get_chat_history_from_mongo(conversation_id: str, max_turns: int = 5, summary_threshold: int = 20):
+# Summary refreshes in flight, one per conversation
+_summary_tasks: Dict[str, asyncio.Task] = {}
+
+
+def format_messages_for_summary(messages: list) -> str:
+    return "\n".join(
+        f"User: {m.get('user_query', '')}\nAssistant: {m.get('message_response', '')}"
+        for m in messages
+    )
+
+
+async def refresh_conversation_summary(
+    conversation_id: str,
+    previous_summary: str,
+    previous_watermark: int,
+    new_watermark: int,
+):
+    """
+    Folds the newly aged-out messages into the stored rolling summary and
+    advances the watermark (the number of messages the summary covers).
+    """
+    store = ConversationStore(collection_name="rag_conversations")
+    new_messages = await store.find_messages_range(conversation_id, previous_watermark, new_watermark)
+    if not new_messages:
+        return
+
+    if previous_summary:
+        prompt = (
+            "Here is a summary of the earlier part of a conversation:\n"
+            + previous_summary
+            + "\n\nUpdate it with the following newer messages. Keep it brief, "
+            "capturing key decisions and user goals:\n"
+            + format_messages_for_summary(new_messages)
+        )
+    else:
+        prompt = (
+            "Summarize this conversation briefly, capturing key decisions and user goals:\n"
+            + format_messages_for_summary(new_messages)
+        )
+
+    summary = (await get_synth_llm().ainvoke(prompt, config={"run_name": "refresh_conversation_summary"})).strip()
+
+    await store.update_conversation_summary(conversation_id, summary, new_watermark)
+
+
+def schedule_summary_refresh(conversation_id: str, previous_summary: str, previous_watermark: int, new_watermark: int):
+    """
+    Runs the summary refresh in the background, at most once at a time per conversation.
+    """
+    running = _summary_tasks.get(conversation_id)
+    if running and not running.done():
+        return
+
+    async def run():
+        try:
+            await refresh_conversation_summary(conversation_id, previous_summary, previous_watermark, new_watermark)
+        except Exception as e:
+            logging.error(f"Error refreshing summary for conversation {conversation_id}: {e}")
+        finally:
+            _summary_tasks.pop(conversation_id, None)
+
+    _summary_tasks[conversation_id] = asyncio.create_task(run())
+
+
+async def get_chat_history_from_mongo(conversation_id: str, max_turns: int = 5, summary_threshold: int = 20):
     if not conversation_id:
         return []
 
     store = ConversationStore(collection_name="rag_conversations")
-    record = store.find_conversation_by_id(conversation_id)
-    if not record or "messages" not in record:
+    # Only the last `max_turns` messages are read, plus the header and the message count
+    window = await store.find_recent_messages(conversation_id, max_turns)
+    if not window:
         return []
 
-    raw_messages = record["messages"]
-    all_msgs = []
-    for item in raw_messages:
-        if isinstance(item, dict):
-            all_msgs.append(item)
-        elif isinstance(item, list):
-            all_msgs.extend([m for m in item if isinstance(m, dict)])
-
-    total_turns = len(all_msgs)
+    record = window["conversation"]
+    total_turns = window["total_messages"]
     chat_history = []
 
-    if total_turns > summary_threshold:
-        older = all_msgs[:-max_turns]
-        text_to_summarize = "\n".join(
-            f"User: {m.get('user_query', '')}\nAssistant: {m.get('message_response', '')}"
-            for m in older
-        )
-        summary = synth_llm.invoke((
-            "Summarize this conversation briefly, capturing key decisions and user goals:\n"
-            + text_to_summarize
-        )).strip()
+    # The stored summary covers the first `summary_watermark` messages
+    summary = record.get("summary")
+    watermark = record.get("summary_watermark", 0)
+    if summary:
         chat_history.append({"role": "system", "content": summary})
 
-    recent = all_msgs[-max_turns:]
-    for m in recent:
+    aged_out = total_turns - max_turns
+    if total_turns > summary_threshold and aged_out > watermark:
+        # Fold only the newly aged-out messages, off the request path
+        schedule_summary_refresh(conversation_id, summary, watermark, aged_out)
+
+    for m in window["messages"]:
         user_q = m.get("user_query")
         assistant_a = m.get("message_response")
         if user_q:
@@ -0,0 +1,153 @@
+import logging
+import os
+from functools import lru_cache
+from typing import Callable, List, Tuple
+from langchain_core.documents import Document
+from services.rag_agent.llm import SYNTHESIS_MODEL
+
+
+# Upper bound on the tokens of retrieved context put into the synthesis prompt
+SYNTH_CONTEXT_TOKEN_BUDGET = int(os.getenv("SYNTH_CONTEXT_TOKEN_BUDGET", "3000"))
+# Shortest suffix/prefix match treated as a chunk overlap rather than a coincidence
+MIN_MERGE_OVERLAP = 20
+
+
+@lru_cache(maxsize=4)
+def get_token_counter(model_name: str = SYNTHESIS_MODEL) -> Tuple[Callable[[str], List[int]], Callable[[List[int]], str]]:
+    """
+    (encode, decode) of the model's tokenizer. Without the tiktoken encoding
+    (e.g. offline), falls back to ~4 characters per token.
+    """
+    try:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model(model_name)
+        return encoding.encode, encoding.decode
+    except Exception as e:
+        logging.warning(f"No tokenizer for {model_name} ({e}), estimating 4 characters per token")
+        return (
+            lambda text: [0] * ((len(text) + 3) // 4),
+            None,
+        )
+
+
+def _overlap(left: str, right: str, min_overlap: int = MIN_MERGE_OVERLAP) -> int:
+    """
+    Length of the longest suffix of `left` that is a prefix of `right`
+    (at least `min_overlap` characters), 0 if there is none.
+    """
+    if len(left) < min_overlap or len(right) < min_overlap:
+        return 0
+    probe = right[:min_overlap]
+    start = max(0, len(left) - len(right))
+    position = left.find(probe, start)
+    while position != -1:
+        if right.startswith(left[position:]):
+            return len(left) - position
+        position = left.find(probe, position + 1)
+    return 0
+
+
+class ContextBlock:
+    """
+    Contiguous text of one page, made of one or more merged hits. Keeps the
+    best score of its hits.
+    """
+
+    def __init__(self, document: Document, score: float):
+        self.text = document.page_content
+        self.metadata = document.metadata
+        self.score = score
+        self.num_chunks = 1
+
+    def absorb(self, other: "ContextBlock") -> bool:
+        """
+        Merges `other` into this block when one contains the other or they
+        overlap at either end.
+        """
+        if other.text in self.text:
+            merged = self.text
+        elif self.text in other.text:
+            merged = other.text
+        else:
+            overlap = _overlap(self.text, other.text)
+            if overlap:
+                merged = self.text + other.text[overlap:]
+            else:
+                overlap = _overlap(other.text, self.text)
+                if not overlap:
+                    return False
+                merged = other.text + self.text[overlap:]
+        self.text = merged
+        self.score = max(self.score, other.score)
+        self.num_chunks += other.num_chunks
+        return True
+
+
+def merge_hits(hits: List[Tuple[Document, float]]) -> List[ContextBlock]:
+    """
+    Merges overlapping or duplicated hits of the same file and page into
+    blocks, and drops blocks whose text repeats another block's.
+    """
+    pages = {}
+    for document, score in hits:
+        key = (document.metadata.get("file_name"), document.metadata.get("page_no"))
+        block = ContextBlock(document, score)
+        blocks = pages.setdefault(key, [])
+        # A merged block can now bridge two earlier ones, so keep merging until stable
+        while True:
+            for existing in blocks:
+                if existing.absorb(block):
+                    blocks.remove(existing)
+                    block = existing
+                    break
+            else:
+                break
+        blocks.append(block)
+
+    unique = {}
+    for block in (block for blocks in pages.values() for block in blocks):
+        key = " ".join(block.text.split())
+        if key not in unique or block.score > unique[key].score:
+            unique[key] = block
+    return list(unique.values())
+
+
+def pack_context(
+    hits: List[Tuple[Document, float]],
+    token_budget: int = SYNTH_CONTEXT_TOKEN_BUDGET,
+    model_name: str = SYNTHESIS_MODEL,
+) -> dict:
+    """
+    Builds the synthesis context from (document, score) hits: overlapping
+    chunks are merged, duplicates removed, and the blocks are added in score
+    order while they fit in `token_budget` tokens of the model's tokenizer.
+    Blocks that do not fit are skipped in favour of smaller lower-scored
+    ones. If even the best block does not fit, it is cut to the budget.
+
+    :return: {"text", "chunks", "blocks", "blocks_used", "tokens"}
+    """
+    encode, decode = get_token_counter(model_name)
+    blocks = sorted(merge_hits(hits), key=lambda block: block.score, reverse=True)
+    separator_tokens = len(encode("\n\n"))
+
+    selected: List[str] = []
+    used = 0
+    for block in blocks:
+        tokens = encode(block.text)
+        cost = len(tokens) + (separator_tokens if selected else 0)
+        if used + cost <= token_budget:
+            selected.append(block.text)
+            used += cost
+        elif not selected and token_budget > 0:
+            # Always keep the head of the best block
+            selected.append(decode(tokens[:token_budget]) if decode else block.text[:token_budget * 4])
+            used = token_budget
+
+    return {
+        "text": "\n\n".join(selected),
+        "chunks": len(hits),
+        "blocks": len(blocks),
+        "blocks_used": len(selected),
+        "tokens": used,
+    }
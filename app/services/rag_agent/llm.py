@@ -0,0 +1,56 @@
+import os
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+ROUTING_MODEL = "gpt-4o-mini"
+SYNTHESIS_MODEL = "gpt-4o-mini"
+
+# Clients are built on first use: importing langchain_openai alone takes a
+# noticeable part of a cold start
+_llm = None
+_synth_llm = None
+_lock = threading.Lock()
+
+
+def configure_langsmith():
+    """
+    Turns on LangSmith tracing for the "agentic_rag" project when a
+    LANGCHAIN_API_KEY is configured. Safe to call more than once.
+    """
+    api_key: Optional[str] = os.getenv("LANGCHAIN_API_KEY")
+    if not api_key:
+        return
+    os.environ["LANGCHAIN_TRACING_V2"] = "true"
+    os.environ.setdefault("LANGCHAIN_PROJECT", "agentic_rag")
+
+
+def get_llm():
+    """
+    Returns the shared chat model used for tool selection.
+    """
+    global _llm
+    with _lock:
+        if _llm is None:
+            from langchain_openai import ChatOpenAI
+
+            configure_langsmith()
+            _llm = ChatOpenAI(model=ROUTING_MODEL, temperature=0, api_key=os.getenv("OPENAI_API_KEY"))
+        return _llm
+
+
+def get_synth_llm():
+    """
+    Returns the shared completion model used for answer synthesis and summaries.
+    """
+    global _synth_llm
+    with _lock:
+        if _synth_llm is None:
+            from langchain_openai import OpenAI
+
+            configure_langsmith()
+            _synth_llm = OpenAI(model=SYNTHESIS_MODEL, temperature=0)
+        return _synth_llm
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from langchain_core.documents import Document
+
+
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "Xenova/ms-marco-MiniLM-L-6-v2")
+# Hybrid hits fetched for reranking, and hits passed on to synthesis
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "30"))
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "5"))
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+RERANK_THREADS = int(os.getenv("RERANK_THREADS", "0")) or None
+
+
+class CrossEncoderReranker:
+    """
+    Local cross-encoder reranker run with FastEmbed (ONNX Runtime) on CPU.
+
+    The query is scored against every candidate in batches of `batch_size`
+    and the `top_n` best candidates are kept, with the cross-encoder score
+    replacing the fusion score. The model is loaded on first use. Scoring
+    runs on one dedicated thread, ONNX Runtime parallelizes each batch.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RERANK_MODEL,
+        batch_size: int = RERANK_BATCH_SIZE,
+        threads: Optional[int] = RERANK_THREADS,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.threads = threads
+        self._model = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+        self.calls = 0
+        self.candidates_scored = 0
+        self.total_seconds = 0.0
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+                self._model = TextCrossEncoder(model_name=self.model_name, threads=self.threads)
+            return self._model
+
+    def rerank(
+        self, query: str, candidates: List[Tuple[Document, float]], top_n: int = RERANK_TOP_N
+    ) -> List[Tuple[Document, float]]:
+        if not candidates:
+            return []
+        started = time.perf_counter()
+        scores = list(self._get_model().rerank(
+            query, [doc.page_content for doc, _ in candidates], batch_size=self.batch_size
+        ))
+        ranked = sorted(zip((doc for doc, _ in candidates), scores), key=lambda pair: pair[1], reverse=True)
+
+        self.calls += 1
+        self.candidates_scored += len(candidates)
+        self.total_seconds += time.perf_counter() - started
+        return [(doc, float(score)) for doc, score in ranked[:top_n]]
+
+    async def arerank(
+        self, query: str, candidates: List[Tuple[Document, float]], top_n: int = RERANK_TOP_N
+    ) -> List[Tuple[Document, float]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.rerank, query, candidates, top_n)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": RERANK_ENABLED,
+            "model": self.model_name,
+            "calls": self.calls,
+            "candidates_scored": self.candidates_scored,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 2) if self.calls else 0.0,
+        }
+
+
+_reranker: Optional[CrossEncoderReranker] = None
+
+
+def get_reranker() -> CrossEncoderReranker:
+    """
+    Returns the process-wide reranker.
+    """
+    global _reranker
+    if _reranker is None:
+        _reranker = CrossEncoderReranker()
+    return _reranker
+
+
+async def rerank_or_truncate(query: str, candidates: list, top_n: int = RERANK_TOP_N) -> list:
+    """
+    Reranks the candidates, falling back to their retrieval order when the
+    model cannot be loaded or fails.
+    """
+    try:
+        return await get_reranker().arerank(query, candidates, top_n)
+    except Exception as e:
+        logging.error(f"Reranking failed, keeping the retrieval order: {e}")
+        return candidates[:top_n]
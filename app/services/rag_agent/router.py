@@ -0,0 +1,277 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Optional
+import numpy as np
+
+
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.8"))
+# Private directory for the logged queries and the trained model
+ROUTER_DATA_DIR = os.getenv(
+    "ROUTER_DATA_DIR", os.path.join(os.path.expanduser("~"), ".agentic_rag", "router")
+)
+ROUTER_MODEL_PATH = os.getenv("ROUTER_MODEL_PATH", os.path.join(ROUTER_DATA_DIR, "router.json"))
+ROUTER_QUERY_LOG_PATH = os.getenv("ROUTER_QUERY_LOG_PATH", os.path.join(ROUTER_DATA_DIR, "queries.jsonl"))
+# The query log is rotated to `<path>.1` once it grows past this size
+ROUTER_QUERY_LOG_MAX_BYTES = int(os.getenv("ROUTER_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+ROUTER_HASH_DIMENSIONS = int(os.getenv("ROUTER_HASH_DIMENSIONS", "1024"))
+
+# Steepness of the logistic that turns the centroid margin into a confidence
+ROUTER_MARGIN_SCALE = 10.0
+# Confidence for plain questions when no centroids have been trained yet. Below
+# the default threshold: until scripts/train_router.py has run, the LLM decides
+KEYWORD_ONLY_CONFIDENCE = 0.7
+
+SEARCH_TOOL = "search_knowledge_base"
+BOOKING_TOOL = "book_interview"
+
+BOOKING_PATTERN = re.compile(
+    r"\b(book\w*|schedul\w*|reschedul\w*|appointment\w*|interview\w*|meet\w*|reserv\w*|calendar|slots?"
+    r"|calls?|set\s?up|arrange\w*|availab\w*|catch up)\b",
+    re.IGNORECASE,
+)
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_WEEKDAY = r"(monday|tuesday|wednesday|thursday|friday|saturday|sunday)s?"
+# Times and the date formats of the booking schema ("July 20", "2024-07-20")
+DATE_TIME_PATTERN = re.compile(
+    r"\b(\d{1,2}(:\d{2})?\s?(am|pm)|\d{1,2}:\d{2}|noon|midnight|today|tomorrow|tonight"
+    r"|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}(/\d{2,4})?"
+    rf"|{_MONTH}\s+\d{{1,2}}(st|nd|rd|th)?|\d{{1,2}}(st|nd|rd|th)?\s+(of\s+)?{_MONTH}"
+    rf"|{_WEEKDAY}|(this|next) (week|month))\b",
+    re.IGNORECASE,
+)
+# Mentions of a file, a page or an upload date, which the LLM turns into search filters
+FILTER_CUE_PATTERN = re.compile(
+    r"\b([\w-]+\.(pdf|txt|docx?|md|csv|pptx?|xlsx?)|pages?\s*\d+|p\.\s*\d+"
+    r"|upload\w*|added (since|after|before|last|this|on|in))\b",
+    re.IGNORECASE,
+)
+SEARCH_PATTERN = re.compile(
+    r"^\s*(what|who|whom|whose|when|where|why|how|which|explain|describe|summari[sz]e|define"
+    r"|list|tell me|show me|give me|find|does|do|is|are|can|could|should|compare)\b",
+    re.IGNORECASE,
+)
+# References that only make sense with the chat history (the LLM rewrites those)
+FOLLOW_UP_PATTERN = re.compile(
+    r"\b(it|its|that|this|those|these|they|them|he|she|above|previous|earlier|same|"
+    r"first one|second one|last one)\b",
+    re.IGNORECASE,
+)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s().-]{6,}\d")
+# Capitalized words after the first one, taken to be names
+NAME_PATTERN = re.compile(r"(?<=\s)[A-Z][\w'-]*")
+
+
+def has_booking_cue(query: str) -> bool:
+    return bool(
+        BOOKING_PATTERN.search(query) or EMAIL_PATTERN.search(query) or DATE_TIME_PATTERN.search(query)
+    )
+
+
+def has_filter_cue(query: str) -> bool:
+    return bool(FILTER_CUE_PATTERN.search(query))
+
+
+def redact_booking_query(query: str) -> str:
+    """
+    Replaces the personal details of a booking request (e-mail addresses,
+    phone numbers, dates and times, names) with placeholders, keeping the
+    wording the router is trained on.
+    """
+    query = EMAIL_PATTERN.sub("email", query)
+    query = PHONE_PATTERN.sub("phone", query)
+    query = DATE_TIME_PATTERN.sub("date", query)
+    return NAME_PATTERN.sub("name", query)
+
+
+def hashed_embedding(text: str, dimensions: int = ROUTER_HASH_DIMENSIONS) -> np.ndarray:
+    """
+    Local, deterministic bag-of-words embedding: unigrams and bigrams are
+    feature-hashed (CRC32) into a signed vector, which is L2-normalized.
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature in features:
+        digest = zlib.crc32(feature.encode("utf-8"))
+        vector[digest % dimensions] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class FastPathRouter:
+    """
+    First-stage router that sends confidently-search queries straight to
+    `search_knowledge_base` without the LLM classification call.
+
+    Queries with booking cues (booking keywords, e-mail addresses, times),
+    filter cues (a file name, a page, an upload date) the LLM turns into
+    search filters, or follow-ups that depend on the chat history, always
+    fall back to the LLM. Other queries are scored against per-tool centroids of locally
+    hashed embeddings trained from logged LLM decisions (see `train_router`).
+    Until centroids exist, plain questions get a fixed keyword confidence
+    below the default threshold, so the fast path only starts once trained.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ROUTER_CONFIDENCE_THRESHOLD,
+        model_path: Optional[str] = ROUTER_MODEL_PATH,
+        query_log_path: Optional[str] = ROUTER_QUERY_LOG_PATH,
+        dimensions: int = ROUTER_HASH_DIMENSIONS,
+        query_log_max_bytes: int = ROUTER_QUERY_LOG_MAX_BYTES,
+    ):
+        self.threshold = threshold
+        self.model_path = model_path
+        self.query_log_path = query_log_path
+        self.query_log_max_bytes = query_log_max_bytes
+        self.dimensions = dimensions
+        self.centroids: Dict[str, np.ndarray] = {}
+        self.fast_path_count = 0
+        self.llm_fallback_count = 0
+        self.booking_cue_count = 0
+        self.filter_cue_count = 0
+        self.follow_up_count = 0
+        self._log_lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if not self.model_path or not os.path.exists(self.model_path):
+            return
+        with open(self.model_path, "r", encoding="utf-8") as f:
+            model = json.load(f)
+        if model.get("dimensions") != self.dimensions:
+            logging.warning(f"Ignoring router model {self.model_path}: dimension mismatch")
+            return
+        self.centroids = {
+            tool: np.asarray(centroid, dtype=np.float32)
+            for tool, centroid in model.get("centroids", {}).items()
+        }
+        logging.info(f"Loaded router centroids for {sorted(self.centroids)}")
+
+    def confidence(self, query: str, has_history: bool = False) -> float:
+        """
+        Returns the confidence (0-1) that the query is a plain knowledge base search.
+        """
+        if has_booking_cue(query) or has_filter_cue(query):
+            return 0.0
+        if has_history and FOLLOW_UP_PATTERN.search(query):
+            return 0.0
+
+        if SEARCH_TOOL in self.centroids and BOOKING_TOOL in self.centroids:
+            vector = hashed_embedding(query, self.dimensions)
+            margin = float(vector @ self.centroids[SEARCH_TOOL] - vector @ self.centroids[BOOKING_TOOL])
+            return 1.0 / (1.0 + math.exp(-ROUTER_MARGIN_SCALE * margin))
+
+        return KEYWORD_ONLY_CONFIDENCE if SEARCH_PATTERN.search(query) or query.rstrip().endswith("?") else 0.5
+
+    def route(self, query: str, has_history: bool = False) -> Optional[str]:
+        """
+        Returns the tool name when the fast path is confident, otherwise None
+        (meaning the LLM router should decide).
+        """
+        if has_booking_cue(query):
+            self.booking_cue_count += 1
+        elif has_filter_cue(query):
+            self.filter_cue_count += 1
+        elif has_history and FOLLOW_UP_PATTERN.search(query):
+            self.follow_up_count += 1
+
+        if self.confidence(query, has_history) >= self.threshold:
+            self.fast_path_count += 1
+            return SEARCH_TOOL
+
+        self.llm_fallback_count += 1
+        return None
+
+    def record(self, query: str, tool_name: str):
+        """
+        Appends an LLM routing decision to the query log used for training.
+        Booking requests are redacted first. The log is only readable by the
+        app's user and is rotated once it reaches `query_log_max_bytes`.
+        """
+        if not self.query_log_path:
+            return
+        if tool_name == BOOKING_TOOL:
+            query = redact_booking_query(query)
+        line = json.dumps({"query": query, "tool_name": tool_name}, ensure_ascii=False) + "\n"
+        with self._log_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.query_log_path)), mode=0o700, exist_ok=True)
+            try:
+                if os.path.getsize(self.query_log_path) + len(line) > self.query_log_max_bytes:
+                    os.replace(self.query_log_path, self.query_log_path + ".1")
+            except FileNotFoundError:
+                pass
+            fd = os.open(self.query_log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            with os.fdopen(fd, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def stats(self) -> dict:
+        routed = self.fast_path_count + self.llm_fallback_count
+        return {
+            "enabled": ROUTER_ENABLED,
+            "confidence_threshold": self.threshold,
+            "trained": bool(self.centroids),
+            "fast_path": self.fast_path_count,
+            "llm_fallback": self.llm_fallback_count,
+            "booking_cues": self.booking_cue_count,
+            "filter_cues": self.filter_cue_count,
+            "follow_ups": self.follow_up_count,
+            "fast_path_rate": self.fast_path_count / routed if routed else 0.0,
+        }
+
+
+def train_router(
+    query_log_path: str = ROUTER_QUERY_LOG_PATH,
+    model_path: str = ROUTER_MODEL_PATH,
+    dimensions: int = ROUTER_HASH_DIMENSIONS,
+) -> dict:
+    """
+    Builds per-tool centroids from the logged queries (the rotated log
+    included) and saves them to `model_path`.
+    """
+    sums: Dict[str, np.ndarray] = {}
+    counts: Dict[str, int] = {}
+    log_paths = [path for path in (query_log_path + ".1", query_log_path) if os.path.exists(path)]
+    if not log_paths:
+        raise FileNotFoundError(f"No router query log found at {query_log_path}")
+    for log_path in log_paths:
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                tool = entry["tool_name"]
+                sums.setdefault(tool, np.zeros(dimensions, dtype=np.float32))
+                sums[tool] += hashed_embedding(entry["query"], dimensions)
+                counts[tool] = counts.get(tool, 0) + 1
+
+    centroids = {}
+    for tool, total in sums.items():
+        norm = np.linalg.norm(total)
+        centroids[tool] = (total / norm if norm else total).tolist()
+
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), mode=0o700, exist_ok=True)
+    with open(model_path, "w", encoding="utf-8") as f:
+        json.dump({"dimensions": dimensions, "centroids": centroids, "examples": counts}, f)
+    return counts
+
+
+_router: Optional[FastPathRouter] = None
+
+
+def get_fast_path_router() -> FastPathRouter:
+    """
+    Returns the process-wide fast-path router.
+    """
+    global _router
+    if _router is None:
+        _router = FastPathRouter()
+    return _router
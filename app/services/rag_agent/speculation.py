@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import re
+from typing import Optional
+
+
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() == "true"
+# Token-set similarity above which the router's search query counts as unchanged
+SPECULATIVE_MIN_QUERY_SIMILARITY = float(os.getenv("SPECULATIVE_MIN_QUERY_SIMILARITY", "0.9"))
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def query_tokens(query: str) -> set:
+    return set(_TOKEN_PATTERN.findall(query.lower()))
+
+
+def queries_match(speculated: str, routed: str, min_similarity: float = SPECULATIVE_MIN_QUERY_SIMILARITY) -> bool:
+    """
+    True when the router's query is essentially the raw user input: same
+    words up to case and punctuation, or a Jaccard similarity of at least
+    `min_similarity` between their word sets.
+    """
+    speculated_tokens = query_tokens(speculated)
+    routed_tokens = query_tokens(routed)
+    if not speculated_tokens or not routed_tokens:
+        return speculated.strip() == routed.strip()
+    overlap = len(speculated_tokens & routed_tokens) / len(speculated_tokens | routed_tokens)
+    return overlap >= min_similarity
+
+
+class SpeculativeRetrieval:
+    """
+    Counters of speculative retrievals, started on the raw user input while
+    the LLM router decides. A retrieval is "used" when the router picked
+    search with an unchanged query, "discarded" when it searches for
+    something else, and "cancelled" when it picked another tool.
+    """
+
+    def __init__(self):
+        self.launched = 0
+        self.used = 0
+        self.discarded = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def start(self, coroutine) -> asyncio.Task:
+        self.launched += 1
+        return asyncio.create_task(coroutine)
+
+    @staticmethod
+    async def _stop(task: asyncio.Task):
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    async def cancel(self, task: asyncio.Task):
+        """
+        Stops a retrieval that is not needed because another tool was picked.
+        Its shared query embedding and Qdrant search are cancelled too, unless
+        another request is awaiting the same ones.
+        """
+        await self._stop(task)
+        self.cancelled += 1
+
+    async def discard(self, task: asyncio.Task):
+        """
+        Stops a retrieval whose query differs from the one the router chose.
+        """
+        await self._stop(task)
+        self.discarded += 1
+
+    async def take(self, task: asyncio.Task):
+        """
+        Returns the speculative result, or None when the retrieval failed
+        (the tool then runs normally).
+        """
+        try:
+            result = await task
+        except Exception as e:
+            logging.warning(f"Speculative retrieval failed, searching again: {e}")
+            self.failed += 1
+            return None
+        self.used += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SPECULATIVE_RETRIEVAL,
+            "launched": self.launched,
+            "used": self.used,
+            "discarded": self.discarded,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "hit_rate": self.used / self.launched if self.launched else 0.0,
+        }
+
+
+_speculative_retrieval: Optional[SpeculativeRetrieval] = None
+
+
+def get_speculative_retrieval() -> SpeculativeRetrieval:
+    """
+    Returns the process-wide speculative retrieval counters.
+    """
+    global _speculative_retrieval
+    if _speculative_retrieval is None:
+        _speculative_retrieval = SpeculativeRetrieval()
+    return _speculative_retrieval
@@ -1,20 +1,52 @@
 from langchain_core.tools import tool
+from typing import Optional
 import os 
-import openai
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 COLLECTION_NAME = "uploaded_documents"
 
-from services.ingestion.singleton_wrapper import get_vector_store
+from services.ingestion.singleton_wrapper import aget_vector_store, get_vector_store
+from services.ingestion.corpus_version import get_corpus_version
+from schemas.schemas import SearchFilters
+from utils.single_flight import get_single_flight
+from utils.utils import normalize_text
+
+
+def search_flight_key(query: str, filters: Optional[SearchFilters], k: int) -> tuple:
+    """
+    Key under which identical concurrent searches share one Qdrant call.
+    """
+    if isinstance(filters, SearchFilters):
+        filters = filters.model_dump(exclude_none=True)
+    filters_key = tuple(sorted((name, str(value)) for name, value in (filters or {}).items() if value is not None))
+    return normalize_text(query), filters_key, k, get_corpus_version(COLLECTION_NAME)
+
 
 @tool
-def search_knowledge_base(query: str) -> str:
+def search_knowledge_base(query: str, filters: Optional[SearchFilters] = None, k: int = 5) -> str:
     """
-    Searches the knowledge base for documents relevant to the provided query."""
+    Searches the knowledge base for documents relevant to the provided query,
+    optionally restricted to a file, a page range or an upload date range."""
     try:
-        docs = get_vector_store(COLLECTION_NAME).search_with_scores(query=query, k=5)
+        docs = get_vector_store(COLLECTION_NAME).search_with_scores(query=query, k=k, filters=filters)
+        return docs  # return Document objects, not a string
+    except Exception as e:
+        raise Exception(f"Search failed: {str(e)}")
+
+
+@tool
+async def asearch_knowledge_base(query: str, filters: Optional[SearchFilters] = None, k: int = 5) -> str:
+    """
+    Searches the knowledge base for documents relevant to the provided query without blocking the event loop,
+    optionally restricted to a file, a page range or an upload date range."""
+    try:
+        async def search():
+            vector_store = await aget_vector_store(COLLECTION_NAME)
+            return await vector_store.asearch_with_scores(query=query, k=k, filters=filters)
+
+        docs = await get_single_flight("search").do(search_flight_key(query, filters, k), search)
         return docs  # return Document objects, not a string
     except Exception as e:
         raise Exception(f"Search failed: {str(e)}")
@@ -38,6 +70,8 @@ Include the following points:
 """
 
     try:
+        import openai
+
         # Generate the email body with OpenAI
         openai.api_key = OPENAI_API_KEY
         response = openai.chat.completions.create(
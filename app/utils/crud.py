@@ -1,64 +1,246 @@
+import asyncio
 import logging
-from pymongo.errors import PyMongoError
-from db.mongodb_instance import MongoDBInstance
+import math
+import os
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from db.mongodb_instance import AsyncMongoDBInstance
+from utils.mongodb_message_builder import build_message_bucket, get_current_time
+
+
+# Conversation messages live in fixed-size buckets numbered by `seq`. Only
+# the newest bucket is `open` for appends, and every bucket records in
+# `start` how many messages come before it.
+MESSAGE_BUCKETS_COLLECTION = "rag_message_buckets"
+MESSAGE_BUCKET_SIZE = int(os.getenv("MESSAGE_BUCKET_SIZE", "50"))
+CONVERSATION_SCHEMA_VERSION = 2
+
+# Indexes created at startup (and by the migration script)
+INDEXES = {
+    "rag_conversations": [
+        IndexModel([("conversation_id", ASCENDING)], unique=True, name="conversation_id_unique"),
+    ],
+    MESSAGE_BUCKETS_COLLECTION: [
+        # Partial so buckets written before `seq` existed do not collide until
+        # scripts/migrate_conversation_buckets.py numbers them
+        IndexModel(
+            [("conversation_id", ASCENDING), ("seq", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"seq": {"$exists": True}},
+            name="conversation_id_seq_unique",
+        ),
+    ],
+    "rag_document_registry": [
+        IndexModel([("document_id", ASCENDING)], unique=True, name="document_id_unique"),
+    ],
+    "rag_corpus_versions": [
+        IndexModel([("collection_name", ASCENDING)], unique=True, name="collection_name_unique"),
+    ],
+    "rag_upload_metadata_info": [
+        IndexModel([("document_id", ASCENDING), ("chunk_hash", ASCENDING)], name="document_id_chunk_hash"),
+    ],
+}
+
+
+async def ensure_indexes():
+    """
+    Creates the indexes in INDEXES if they do not exist yet.
+    """
+    instance = AsyncMongoDBInstance()
+    for collection_name, indexes in INDEXES.items():
+        try:
+            await instance.get_collection(collection_name).create_indexes(indexes)
+            logging.info(f"Ensured indexes on {collection_name}")
+        except PyMongoError as e:
+            logging.error(f"Error creating indexes on {collection_name}: {e}")
+            raise Exception(f"Error creating indexes on {collection_name}: {e}")
 
 
 class ConversationStore:
     def __init__(self, collection_name):
         self.collection_name = collection_name
-        self.db = MongoDBInstance().get_database()
+        self.db = AsyncMongoDBInstance().get_database()
         self.collection = self.get_collection()
+        self.buckets = AsyncMongoDBInstance().get_collection(MESSAGE_BUCKETS_COLLECTION)
 
     def get_collection(self):
-        """Check if the collection exists"""
-        try:
-            if self.collection_name in self.db.list_collection_names():
-                logging.info(f"Using existing collection: {self.collection_name}")
-                return self.db[self.collection_name]
-        except PyMongoError as e:
-            logging.error(f"Error accessing collection: {e}")
-            raise Exception(f"Error accessing collection: {e}")
-        
-        
-    def store_metadata(self, metadata: dict):
+        """Return the cached handle of the collection (no server round trip)"""
+        return AsyncMongoDBInstance().get_collection(self.collection_name)
+
+
+    async def store_metadata(self, metadata: dict):
         """
         Stores metadata in the conversation_interview collection.
         """
         try:
-            result = self.collection.insert_one(metadata)
+            result = await self.collection.insert_one(metadata)
             logging.info(f"Metadata saved with ID: {result.inserted_id}")
             return str(result.inserted_id)
         except PyMongoError as e:
             logging.error(f"Error saving metadata: {e}")
             raise Exception(f"Error saving metadata: {e}")
-        
-        
-    def save_booking(self, booking_data: dict):
+
+
+    async def store_metadata_records(self, records: list):
+        """
+        Stores a batch of chunk metadata records in one round trip.
+        """
+        if not records:
+            return []
+        try:
+            result = await self.collection.insert_many(records, ordered=False)
+            logging.info(f"Saved {len(result.inserted_ids)} metadata records")
+            return [str(inserted_id) for inserted_id in result.inserted_ids]
+        except PyMongoError as e:
+            logging.error(f"Error saving metadata records: {e}")
+            raise Exception(f"Error saving metadata records: {e}")
+
+
+    async def delete_metadata_records(self, document_id: str, chunk_hashes: list):
+        """
+        Deletes the metadata records of the given chunks of a document.
+        """
+        if not chunk_hashes:
+            return 0
+        try:
+            result = await self.collection.delete_many(
+                {"document_id": document_id, "chunk_hash": {"$in": chunk_hashes}}
+            )
+            logging.info(f"Deleted {result.deleted_count} metadata records of document {document_id}")
+            return result.deleted_count
+        except PyMongoError as e:
+            logging.error(f"Error deleting metadata records: {e}")
+            raise Exception(f"Error deleting metadata records: {e}")
+
+
+    async def delete_unregistered_metadata_records(self, file_name: str):
+        """
+        Deletes the metadata records of a file written before chunks were
+        hashed (they have no chunk_hash).
+        """
+        try:
+            result = await self.collection.delete_many({"metadata.file_name": file_name, "chunk_hash": None})
+            if result.deleted_count:
+                logging.info(f"Deleted {result.deleted_count} unregistered metadata records of {file_name}")
+            return result.deleted_count
+        except PyMongoError as e:
+            logging.error(f"Error deleting metadata records: {e}")
+            raise Exception(f"Error deleting metadata records: {e}")
+
+
+    async def save_booking(self, booking_data: dict):
         """
         Stores booking information in the booking_interview collection.
         """
         try:
-            result = self.collection.insert_one(booking_data)
+            result = await self.collection.insert_one(booking_data)
             logging.info(f"Booking information saved with ID: {result.inserted_id}")
             return str(result.inserted_id)
         except PyMongoError as e:
             logging.error(f"Error saving booking: {e}")
             raise Exception(f"Error saving booking: {e}")
-        
-        
 
-    def find_conversation_by_id(self, conversation_id: str):
+
+
+    async def find_conversation_by_id(self, conversation_id: str):
         """
         Checks if a conversation with the given conversation_id exists in the database.
 
         :param conversation_id: The conversation ID to check
-        :return: The conversation document if it exists, None otherwise
+        :return: The conversation header document if it exists, None otherwise
         """
-        return self.collection.find_one({"conversation_id": conversation_id})
+        return await self.collection.find_one({"conversation_id": conversation_id})
+
+    async def find_recent_messages(self, conversation_id: str, max_messages: int):
+        """
+        Fetches the conversation header and the last `max_messages` messages
+        concurrently. Only the tail of the newest buckets is transferred,
+        through a $slice projection, and the total message count is read off
+        the newest bucket (its `start` plus its `count`).
+
+        :return: None if the conversation does not exist, otherwise a dict with
+                 "conversation", "messages" (oldest first) and "total_messages"
+        """
+        buckets_needed = math.ceil(max_messages / MESSAGE_BUCKET_SIZE) + 1
+        tail_cursor = (
+            self.buckets.find(
+                {"conversation_id": conversation_id},
+                {"messages": {"$slice": -max_messages}, "_id": 0},
+            )
+            .sort("seq", DESCENDING)
+            .limit(buckets_needed)
+        )
+
+        header, tail_buckets = await asyncio.gather(
+            self.collection.find_one(
+                {"conversation_id": conversation_id},
+                {"summary": 1, "summary_watermark": 1, "_id": 0},
+            ),
+            tail_cursor.to_list(),
+        )
+        if header is None:
+            return None
+
+        messages = []
+        for bucket in reversed(tail_buckets):
+            messages.extend(bucket.get("messages", []))
+
+        newest = tail_buckets[0] if tail_buckets else {}
+        return {
+            "conversation": header,
+            "messages": messages[-max_messages:] if max_messages > 0 else [],
+            "total_messages": newest.get("start", 0) + newest.get("count", 0),
+        }
+
+    async def find_messages_range(self, conversation_id: str, start: int, end: int):
+        """
+        Returns the messages at positions [start, end) of the conversation.
+        """
+        if end <= start:
+            return []
+        cursor = await self.buckets.aggregate([
+            {"$match": {"conversation_id": conversation_id}},
+            {"$sort": {"seq": ASCENDING}},
+            {"$unwind": "$messages"},
+            {"$skip": start},
+            {"$limit": end - start},
+            {"$replaceRoot": {"newRoot": "$messages"}},
+        ])
+        return await cursor.to_list()
+
+    async def update_conversation_summary(self, conversation_id: str, summary: str, summary_watermark: int):
+        """
+        Stores the rolling summary of a conversation together with the number
+        of messages it covers. Never moves the watermark backwards.
+        """
+        try:
+            result = await self.collection.update_one(
+                {
+                    "conversation_id": conversation_id,
+                    "$or": [
+                        {"summary_watermark": {"$exists": False}},
+                        {"summary_watermark": {"$lt": summary_watermark}},
+                    ],
+                },
+                {"$set": {"summary": summary, "summary_watermark": summary_watermark}},
+            )
+            if result.matched_count > 0:
+                logging.info(f"Updated summary of conversation {conversation_id} up to message {summary_watermark}")
+        except PyMongoError as e:
+            logging.error(f"Error updating conversation summary: {e}")
+            raise Exception(f"Error updating conversation summary: {e}")
 
     async def create_new_conversation(self, record):
         try:
-            self.collection.insert_one(record)
+            messages = record.get("messages", [])
+            header = {key: value for key, value in record.items() if key != "messages"}
+            header["schema_version"] = CONVERSATION_SCHEMA_VERSION
+
+            await self.collection.insert_one(header)
+            if messages:
+                await self.buckets.insert_one(
+                    build_message_bucket(record["conversation_id"], 0, 0, messages)
+                )
             logging.info(f"New conversation created with ID: {record['conversation_id']}")
             return str(record['conversation_id'])
         except PyMongoError as e:
@@ -66,49 +248,92 @@ class ConversationStore:
             raise Exception(f"Error creating new conversation: {e}")
 
     async def append_message_to_conversation(self, conversation_id, message):
+        """
+        Appends one message (or a list of messages) to the conversation's open
+        bucket with one conditional update. Only when that bucket is full is
+        the newest bucket read, closed and followed by a new open one;
+        concurrent appenders race on the unique (conversation_id, seq) index,
+        so only one of them opens it and the others retry.
+        """
+        messages = message if isinstance(message, list) else [message]
+        if not messages:
+            return
         try:
-            # Retrieve the ObjectId from the conversation_id
-            document = self.collection.find_one(
-                {"conversation_id": conversation_id}, {"_id": 1}
-            )
-            if not document:
-                logging.warning(
-                    f"No conversation found with conversation_id: {conversation_id}"
+            while True:
+                now = get_current_time()
+                result = await self.buckets.update_one(
+                    {
+                        "conversation_id": conversation_id,
+                        "open": True,
+                        "count": {"$lte": MESSAGE_BUCKET_SIZE - len(messages)},
+                    },
+                    {
+                        "$push": {"messages": {"$each": messages}},
+                        "$inc": {"count": len(messages)},
+                        "$set": {"updatedAt": now},
+                    },
                 )
-                return
+                if result.matched_count > 0:
+                    break
 
-            # Extract the ObjectId
-            object_id = document["_id"]
+                newest = await self.buckets.find_one(
+                    {"conversation_id": conversation_id, "seq": {"$exists": True}},
+                    {"seq": 1, "start": 1, "count": 1, "open": 1, "_id": 0},
+                    sort=[("seq", DESCENDING)],
+                )
+                if newest is None:
+                    if await self.collection.find_one({"conversation_id": conversation_id}, {"_id": 1}) is None:
+                        logging.warning(f"No conversation found with conversation_id: {conversation_id}")
+                        return
+                    seq, start = 0, 0
+                elif newest.get("open") and newest["count"] + len(messages) <= MESSAGE_BUCKET_SIZE:
+                    # Another appender opened it in the meantime
+                    continue
+                else:
+                    await self.buckets.update_one(
+                        {"conversation_id": conversation_id, "seq": newest["seq"]},
+                        {"$set": {"open": False}},
+                    )
+                    seq, start = newest["seq"] + 1, newest.get("start", 0) + newest["count"]
 
-            # Append the message to the conversation
-            result = self.collection.update_one(
-                {"_id": object_id}, {"$push": {"messages": message}}
+                try:
+                    await self.buckets.insert_one(build_message_bucket(conversation_id, seq, start, messages))
+                except DuplicateKeyError:
+                    # Lost the race to open it, append to the winner's bucket
+                    continue
+                logging.info(f"Opened message bucket {seq} for conversation with ID: {conversation_id}")
+                break
+            logging.info(
+                f"Appended message to conversation with ID: {conversation_id}"
             )
-
-            if result.matched_count > 0:
-                logging.info(
-                    f"Appended message to conversation with ID: {conversation_id}"
-                )
-            else:
-                logging.warning(f"No conversation found with ObjectId: {object_id}")
         except PyMongoError as e:
             logging.error(f"Error appending message to conversation: {e}")
             raise Exception(f"Error appending message to conversation: {e}")
 
 
-    def fetch_all_queries_and_responses(self):
+    async def fetch_all_queries_and_responses(self):
         results = []
-        documents = self.collection.find(
-            {},
+        documents = await self.buckets.aggregate([
+            {"$sort": {"conversation_id": ASCENDING, "seq": ASCENDING}},
             {
-                "messages.user_query": 1,
-                "messages.message_response": 1,
-                "title": 1,
-                "createdAt": 1,
-                "_id": 0,
+                "$lookup": {
+                    "from": self.collection_name,
+                    "localField": "conversation_id",
+                    "foreignField": "conversation_id",
+                    "as": "conversation",
+                }
             },
-        )
-        for doc in documents:
+            {
+                "$project": {
+                    "messages.user_query": 1,
+                    "messages.message_response": 1,
+                    "title": {"$first": "$conversation.title"},
+                    "createdAt": {"$first": "$conversation.createdAt"},
+                    "_id": 0,
+                }
+            },
+        ])
+        async for doc in documents:
             title = doc.get("title", "")
             created_at = doc.get("createdAt", "")
             messages = doc.get("messages", [])
@@ -121,4 +346,4 @@ class ConversationStore:
                         "message_response": message["message_response"],
                     }
                 )
-        return results
\ No newline at end of file
+        return results
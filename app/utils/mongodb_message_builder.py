@@ -25,24 +25,28 @@ def build_booking_record(
     }
 
 
-def build_metadata_records_from_documents(documents: list):
+def build_metadata_records_from_documents(documents: list, chunk_ids: Optional[list] = None):
     """
     Takes a list of LangChain Document objects (from one file)
     and returns a list of metadata records, grouped under one document_id.
+    The document id and chunk hash stamped on the chunk metadata at ingestion
+    are reused when present, and `chunk_ids` (the Qdrant point ids) when given.
     """
-    document_id = generate_uuid()  # shared ID for all chunks of this document
+    fallback_document_id = generate_uuid()  # shared ID for all chunks of this document
     records = []
 
-    for doc in documents:
+    for index, doc in enumerate(documents):
         metadata = doc.metadata or {}
         record = {
-            "chunk_id": generate_uuid(),
-            "document_id": document_id,
+            "chunk_id": chunk_ids[index] if chunk_ids else generate_uuid(),
+            "document_id": metadata.get("document_id") or fallback_document_id,
+            "chunk_hash": metadata.get("chunk_hash"),
             "page_content": doc.page_content,
             "metadata": {
                 "file_name": metadata.get("file_name"),
                 "page_no": metadata.get("page_no"),
                 "chunking_strategy": metadata.get("chunking_strategy"),
+                "table_extraction": metadata.get("table_extraction"),
                 "embedding_model": metadata.get("embedding_model"),
                 "created_at": get_current_time(),
             }
@@ -72,4 +76,21 @@ def build_conversation_record(
         "conversation_id": conversation_id if conversation_id else generate_uuid(),
         "messages": messages,
         "createdAt": get_current_time(),
-    }
\ No newline at end of file
+    }
+
+
+def build_message_bucket(conversation_id: str, seq: int, start: int, messages: list):
+    """
+    A new open message bucket holding `messages`, preceded by `start` messages.
+    """
+    now = get_current_time()
+    return {
+        "conversation_id": conversation_id,
+        "seq": seq,
+        "start": start,
+        "open": True,
+        "count": len(messages),
+        "messages": messages,
+        "createdAt": now,
+        "updatedAt": now,
+    }
@@ -1,4 +1,7 @@
+import hashlib
 import re
+from itertools import islice
+from typing import Iterable, Iterator, List
 
 def clean_page_content(text: str) -> str:
     """
@@ -18,3 +21,27 @@ def clean_page_content(text: str) -> str:
     
     # Rejoin cleaned lines
     return "\n".join(lines).strip()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes text for fingerprinting by collapsing every run of whitespace
+    into a single space and stripping the ends.
+    """
+    return " ".join(text.split())
+
+
+def text_fingerprint(text: str) -> str:
+    """
+    Returns a stable SHA-256 hex digest of the normalized text.
+    """
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    Yields lists of up to `size` items, consuming the iterable lazily.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
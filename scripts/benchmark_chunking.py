@@ -0,0 +1,100 @@
+"""
+Compares the "recursive" chunking strategy (RecursiveCharacterTextSplitter
+followed by clean_page_content on every chunk) with the single-pass "fused"
+strategy on the same pages.
+
+Pages are loaded once up front, so only splitting and cleaning are timed.
+Without paths, a synthetic corpus of noisy extracted-PDF-like text is used.
+
+Usage (from the repository root):
+    python scripts/benchmark_chunking.py [PATH ...] [--chunk-size 1000] [--chunk-overlap 200]
+                                         [--length-unit chars|tokens] [--repeat 5]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from langchain_core.documents import Document
+from services.ingestion.loader import ParallelDocumentLoader
+from services.ingestion.splitter import TextChunker
+
+
+def synthetic_pages(num_pages: int = 200, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    words = ["ingestion", "vector", "retrieval", "table", "policy", "agent", "chunk", "embedding",
+             "latency", "document", "section", "interview", "summary", "query", "result", "page"]
+    pages = []
+    for page_no in range(num_pages):
+        lines = []
+        for _ in range(rng.randint(40, 70)):
+            line = " ".join(rng.choice(words) for _ in range(rng.randint(4, 16)))
+            # Extracted text is full of ragged spacing and blank lines
+            lines.append(rng.choice(["", "  ", "\t"]) + line.replace(" ", rng.choice([" ", " ", "  "])))
+            if rng.random() < 0.15:
+                lines.append(rng.choice(["", "   ", "\t "]))
+        pages.append(Document(page_content="\n".join(lines), metadata={"file_name": "synthetic.pdf", "page": page_no}))
+    return pages
+
+
+def run_strategy(chunker: TextChunker, pages: list, repeat: int) -> dict:
+    timings = []
+    chunks = []
+    for _ in range(repeat):
+        # iter_split_documents works on copies-by-split, the pages stay untouched
+        started = time.perf_counter()
+        chunks = list(chunker.iter_split_documents(pages))
+        timings.append(time.perf_counter() - started)
+    lengths = [len(chunk.page_content) for chunk in chunks]
+    return {
+        "median_seconds": statistics.median(timings),
+        "chunks": len(chunks),
+        "avg_chunk_chars": statistics.mean(lengths) if lengths else 0,
+        "max_chunk_chars": max(lengths) if lengths else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="PDF/text files or directories to load pages from")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--length-unit", choices=["chars", "tokens"], default="chars",
+                        help="Unit of the fused strategy's chunk size and overlap")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per strategy (the median is reported)")
+    args = parser.parse_args()
+
+    if args.paths:
+        pages = [page for path in args.paths for page in ParallelDocumentLoader(path).lazy_load()]
+    else:
+        pages = synthetic_pages()
+    total_chars = sum(len(page.page_content) for page in pages)
+    print(f"{len(pages)} pages, {total_chars / 1e6:.2f}M characters, repeat={args.repeat}\n")
+
+    strategies = {
+        "recursive": TextChunker(args.chunk_size, args.chunk_overlap, chunking_strategy="recursive"),
+        f"fused ({args.length_unit})": TextChunker(
+            args.chunk_size, args.chunk_overlap, chunking_strategy="fused", length_unit=args.length_unit
+        ),
+    }
+    results = {name: run_strategy(chunker, pages, args.repeat) for name, chunker in strategies.items()}
+
+    print(f"{'strategy':<18}{'seconds':>10}{'MB/s':>10}{'chunks':>9}{'avg chars':>11}{'max chars':>11}")
+    for name, result in results.items():
+        throughput = total_chars / 1e6 / result["median_seconds"] if result["median_seconds"] else 0.0
+        print(
+            f"{name:<18}{result['median_seconds']:>10.4f}{throughput:>10.2f}{result['chunks']:>9}"
+            f"{result['avg_chunk_chars']:>11.0f}{result['max_chunk_chars']:>11}"
+        )
+
+    baseline, fused = results.values()
+    if fused["median_seconds"]:
+        print(f"\nfused speedup: {baseline['median_seconds'] / fused['median_seconds']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
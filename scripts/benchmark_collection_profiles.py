@@ -0,0 +1,177 @@
+"""
+Compares the collection profiles on our own vectors: dense recall@k against
+exact search, query latency, and the estimated RAM taken by dense vectors.
+
+A sample of points (dense vectors and payloads) is read from an existing
+collection. A few of them are held out as queries and the rest are copied
+into one temporary `<collection>__bench_<profile>` collection per profile.
+Exact results come from a full scan without quantization. Without a source
+collection (or with --synthetic), random unit vectors are used instead.
+
+Run it against a Qdrant server. Local mode (--location :memory:) always
+searches exactly and ignores HNSW and quantization, so every profile scores
+a recall of 1.0. It is refused unless --allow-local is given, for smoke
+tests of the script itself.
+
+Usage (from the repository root):
+    python scripts/benchmark_collection_profiles.py [--collection uploaded_documents] [--profiles latency balanced memory]
+                                                    [--sample 20000] [--queries 200] [--k 5] [--keep]
+                                                    [--synthetic 10000 --dimensions 1536] [--location http://localhost:6333]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from qdrant_client import QdrantClient, models
+from services.ingestion.collection_profiles import COLLECTION_PROFILES, get_collection_profile
+from services.ingestion.vectorstore import create_qdrant_clients
+
+
+def sample_points(client, collection_name: str, sample: int) -> list:
+    points = []
+    offset = None
+    while len(points) < sample:
+        batch, offset = client.scroll(
+            collection_name=collection_name,
+            limit=min(1000, sample - len(points)),
+            offset=offset,
+            with_payload=True,
+            with_vectors=["dense"],
+        )
+        points.extend((p.id, p.vector["dense"], p.payload) for p in batch)
+        if offset is None:
+            break
+    return points
+
+
+def synthetic_points(count: int, dimensions: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    points = []
+    for point_id in range(count):
+        vector = [rng.gauss(0, 1) for _ in range(dimensions)]
+        norm = sum(x * x for x in vector) ** 0.5
+        points.append((point_id, [x / norm for x in vector], {}))
+    return points
+
+
+def load_profile_collection(client, name: str, profile, corpus: list, dimensions: int, batch_size: int = 256):
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(name, **profile.create_collection_kwargs(dimensions))
+    for start in range(0, len(corpus), batch_size):
+        client.upsert(
+            collection_name=name,
+            points=[
+                models.PointStruct(id=point_id, vector={"dense": vector}, payload=payload)
+                for point_id, vector, payload in corpus[start:start + batch_size]
+            ],
+            wait=True,
+        )
+    # Let the optimizer build the HNSW graph and quantized vectors first
+    while client.get_collection(name).status != models.CollectionStatus.GREEN:
+        time.sleep(1)
+
+
+def search_ids(client, name: str, vector, k: int, search_params) -> list:
+    response = client.query_points(
+        collection_name=name, query=vector, using="dense", limit=k,
+        search_params=search_params, with_payload=False, with_vectors=False,
+    )
+    return [point.id for point in response.points]
+
+
+def estimate_dense_ram_mb(profile, count: int, dimensions: int) -> float:
+    vector_bytes = 0 if profile.vectors_on_disk else dimensions * 4
+    if profile.quantization == "scalar":
+        vector_bytes += dimensions
+    elif profile.quantization == "binary":
+        vector_bytes += dimensions / 8
+    # HNSW links: ~2*m neighbours per point on layer 0, 4 bytes each
+    graph_bytes = 0 if profile.hnsw_on_disk else profile.m * 2 * 4
+    return count * (vector_bytes + graph_bytes) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default="uploaded_documents", help="Collection to sample vectors from")
+    parser.add_argument("--profiles", nargs="+", default=list(COLLECTION_PROFILES), choices=list(COLLECTION_PROFILES))
+    parser.add_argument("--sample", type=int, default=20000, help="Points to sample from the collection")
+    parser.add_argument("--queries", type=int, default=200, help="Sampled points held out as queries")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--synthetic", type=int, help="Use this many random vectors instead of the collection")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Size of the synthetic vectors")
+    parser.add_argument("--location", help="Qdrant URL instead of QDRANT_HOST_URL")
+    parser.add_argument("--allow-local", action="store_true",
+                        help="Allow --location :memory: (exact search only, the numbers are meaningless)")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections")
+    args = parser.parse_args()
+
+    local = args.location == ":memory:"
+    if local and not args.allow_local:
+        sys.exit(
+            "Local mode ignores HNSW and quantization (every profile scores recall 1.0). "
+            "Point --location at a Qdrant server, or pass --allow-local to smoke-test the script."
+        )
+    if local:
+        print("WARNING: local mode searches exactly, recall and latency do not reflect the profiles")
+
+    client = QdrantClient(location=args.location) if args.location else create_qdrant_clients()[0]
+
+    if args.synthetic or not client.collection_exists(args.collection):
+        points = synthetic_points(args.synthetic or args.sample, args.dimensions)
+        print(f"Using {len(points)} synthetic {args.dimensions}-dimensional vectors")
+    else:
+        points = sample_points(client, args.collection, args.sample)
+        print(f"Sampled {len(points)} points from {args.collection}")
+    if len(points) <= args.queries:
+        sys.exit("Not enough points: sample more than --queries")
+
+    random.Random(13).shuffle(points)
+    queries = [vector for _, vector, _ in points[:args.queries]]
+    corpus = points[args.queries:]
+    dimensions = len(corpus[0][1])
+    exact_params = models.SearchParams(exact=True, quantization=models.QuantizationSearchParams(ignore=True))
+
+    results = {}
+    for profile_name in args.profiles:
+        profile = get_collection_profile(profile_name)
+        name = f"{args.collection}__bench_{profile_name}"
+        print(f"Loading {len(corpus)} points into {name}...")
+        load_profile_collection(client, name, profile, corpus, dimensions)
+
+        search_params = profile.search_params()
+        recalls = []
+        latencies = []
+        for vector in queries:
+            truth = set(search_ids(client, name, vector, args.k, exact_params))
+            started = time.perf_counter()
+            found = search_ids(client, name, vector, args.k, search_params)
+            latencies.append((time.perf_counter() - started) * 1000)
+            recalls.append(len(truth.intersection(found)) / max(len(truth), 1))
+
+        latencies.sort()
+        results[profile_name] = {
+            "recall": statistics.mean(recalls),
+            "p50_ms": latencies[len(latencies) // 2],
+            "p95_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+            "ram_mb": estimate_dense_ram_mb(profile, len(corpus), dimensions),
+        }
+        if not args.keep:
+            client.delete_collection(name)
+
+    print(f"\n{len(corpus)} points, {len(queries)} queries, k={args.k}\n")
+    print(f"{'profile':<10}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p95 ms':>10}{'dense RAM MB':>14}")
+    for profile_name, result in results.items():
+        print(
+            f"{profile_name:<10}{result['recall']:>10.3f}{result['p50_ms']:>10.2f}"
+            f"{result['p95_ms']:>10.2f}{result['ram_mb']:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
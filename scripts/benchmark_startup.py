@@ -0,0 +1,83 @@
+"""
+Measures the cold import time of the API (what runs before uvicorn can bind)
+with `python -X importtime`, in fresh interpreters, and lists the modules
+with the largest cumulative import time.
+
+With --budget-ms the script exits with status 1 when the median import time
+of the module exceeds the budget, so import-time regressions can fail CI.
+
+Usage (from the repository root):
+    python scripts/benchmark_startup.py [--module main] [--repeat 5] [--top 15] [--budget-ms 2000]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+
+# "import time: self [us] | cumulative | imported package" lines of -X importtime
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module: str) -> dict:
+    """
+    Imports `module` in a fresh interpreter and returns the cumulative import
+    time of every module (in microseconds) as reported by -X importtime.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module to import, relative to app/")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters to run (the median is reported)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail when the median import time exceeds this")
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.repeat)]
+    totals_ms = [run[args.module] / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+
+    # Median cumulative time per module across runs
+    modules = {name for run in runs for name in run}
+    per_module = {
+        name: statistics.median(run.get(name, 0) for run in runs) / 1000
+        for name in modules
+        if name != args.module
+    }
+
+    print(f"import {args.module}: median {median_ms:.0f} ms "
+          f"(min {min(totals_ms):.0f} ms, max {max(totals_ms):.0f} ms, {args.repeat} runs)\n")
+    print(f"{'cumulative ms':>14}  module")
+    for name, elapsed_ms in sorted(per_module.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{elapsed_ms:>14.1f}  {name}")
+
+    if args.budget_ms is not None:
+        if median_ms > args.budget_ms:
+            print(f"\nFAIL: {median_ms:.0f} ms is over the budget of {args.budget_ms:.0f} ms")
+            sys.exit(1)
+        print(f"\nOK: {median_ms:.0f} ms is within the budget of {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Moves an existing Qdrant collection to a collection profile ("latency",
+"balanced" or "memory", see services/ingestion/collection_profiles.py) and
+creates the payload indexes the app filters on.
+
+By default the collection is updated in place: Qdrant quantizes, moves
+vectors to disk and rebuilds the HNSW graph in the background while the
+collection keeps serving searches. With --recreate the points are copied
+into a fresh `<collection>__<profile>_<timestamp>` collection instead,
+which needs room for a second copy but compacts the storage. The app keeps
+searching the old collection during the copy. Once the copy is complete,
+the collection name is switched to the new collection through a Qdrant
+alias. When the name is already an alias, this switch is atomic. The first
+--recreate of a plain collection has to delete that collection before it
+can create the alias, which leaves a gap of one request.
+
+Stop ingestion (uploads) during --recreate: points written to the old
+collection while it is being copied are not carried over. A --recreate run
+that was interrupted can simply be re-run, since the name only moves to a
+complete copy and the leftover copies are deleted.
+
+Usage (from the repository root):
+    python scripts/migrate_collection_profile.py --profile memory [--collection uploaded_documents]
+                                                 [--recreate] [--batch-size 256] [--dry-run]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from qdrant_client import models
+from services.ingestion.collection_profiles import COLLECTION_PROFILES, ensure_payload_indexes, get_collection_profile
+from services.ingestion.vectorstore import create_qdrant_clients
+
+
+def copy_points(client, source: str, target: str, batch_size: int) -> int:
+    copied = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source, limit=batch_size, offset=offset, with_payload=True, with_vectors=True
+        )
+        if points:
+            client.upsert(
+                collection_name=target,
+                points=[models.PointStruct(id=p.id, vector=p.vector, payload=p.payload) for p in points],
+                wait=True,
+            )
+            copied += len(points)
+            print(f"  {source} -> {target}: {copied} points")
+        if offset is None:
+            return copied
+
+
+def resolve_alias(client, name: str) -> str:
+    """
+    The collection behind `name`, which is either an alias or a collection.
+    """
+    for alias in client.get_aliases().aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return name
+
+
+def delete_leftover_copies(client, collection_name: str, keep: str):
+    prefixes = tuple(f"{collection_name}__{profile}_" for profile in COLLECTION_PROFILES)
+    for collection in client.get_collections().collections:
+        if collection.name.startswith(prefixes) and collection.name != keep:
+            print(f"  deleting leftover copy {collection.name}")
+            client.delete_collection(collection.name)
+
+
+def recreate(client, collection_name: str, profile, vector_size: int, batch_size: int):
+    source = resolve_alias(client, collection_name)
+    delete_leftover_copies(client, collection_name, keep=source)
+    target = f"{collection_name}__{profile.name}_{int(time.time())}"
+
+    client.create_collection(target, **profile.create_collection_kwargs(vector_size))
+    ensure_payload_indexes(client, target)
+    source_count = client.count(source, exact=True).count
+    copied = copy_points(client, source, target, batch_size)
+    if copied != source_count or client.count(target, exact=True).count != source_count:
+        raise RuntimeError(
+            f"Copy of {source} into {target} is incomplete (was ingestion running?), "
+            f"{collection_name} is untouched"
+        )
+
+    if source == collection_name:
+        # A plain collection: its name must be freed before it can become an alias
+        print(f"  replacing collection {collection_name} by an alias of {target}")
+        client.delete_collection(collection_name)
+        operations = []
+    else:
+        operations = [models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=collection_name))]
+    operations.append(models.CreateAliasOperation(
+        create_alias=models.CreateAlias(collection_name=target, alias_name=collection_name)
+    ))
+    client.update_collection_aliases(change_aliases_operations=operations)
+    print(f"  {collection_name} -> {target}")
+
+    if source != collection_name:
+        client.delete_collection(source)
+
+
+def wait_until_optimized(client, collection_name: str, timeout: float = 3600):
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        status = client.get_collection(collection_name).status
+        if status == models.CollectionStatus.GREEN:
+            return
+        print(f"  status {status}, waiting for the optimizer...")
+        time.sleep(5)
+    print(f"Gave up waiting after {timeout:.0f}s, the optimizer keeps running in the background")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default="uploaded_documents")
+    parser.add_argument("--profile", required=True, choices=list(COLLECTION_PROFILES))
+    parser.add_argument("--recreate", action="store_true",
+                        help="Copy into a fresh collection and switch the name to it (stop ingestion first)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per copy batch (--recreate)")
+    parser.add_argument("--no-wait", action="store_true", help="Do not wait for the optimizer to finish")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the current and the target settings")
+    args = parser.parse_args()
+
+    client, _ = create_qdrant_clients()
+    profile = get_collection_profile(args.profile)
+    info = client.get_collection(args.collection)
+    vector_size = info.config.params.vectors["dense"].size
+    source = resolve_alias(client, args.collection)
+    print(f"{args.collection}: {info.points_count} points, {vector_size}-dimensional dense vectors")
+    if source != args.collection:
+        print(f"  alias of {source}")
+    print(f"  current: hnsw={info.config.hnsw_config} quantization={info.config.quantization_config}")
+    print(f"  dense:   {info.config.params.vectors['dense']}")
+    print(f"  target:  {profile.describe()}")
+    if args.dry_run:
+        return
+
+    if args.recreate:
+        recreate(client, args.collection, profile, vector_size, args.batch_size)
+    else:
+        client.update_collection(source, **profile.update_collection_kwargs())
+    ensure_payload_indexes(client, resolve_alias(client, args.collection))
+
+    if not args.no_wait:
+        wait_until_optimized(client, args.collection)
+    print(f"Migrated {args.collection} to the {profile.name} profile. "
+          f"Set QDRANT_COLLECTION_PROFILE={profile.name} so searches use its parameters.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Moves the embedded `messages` arrays of `rag_conversations` into
+`rag_message_buckets`, numbers buckets written before they had a `seq` (or a
+`start` and `open` flag), and creates the indexes used by the history reads. Buckets are always
+MESSAGE_BUCKET_SIZE messages, the size the app appends with.
+
+The script can be re-run safely: a conversation keeps its legacy `messages`
+array until its buckets are written, and any buckets left over from an
+interrupted run are replaced. Run it while the API is stopped.
+
+Usage (from the repository root):
+    python scripts/migrate_conversation_buckets.py [--dry-run]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from db.mongodb_instance import MongoDBInstance
+from utils.crud import CONVERSATION_SCHEMA_VERSION, INDEXES, MESSAGE_BUCKET_SIZE, MESSAGE_BUCKETS_COLLECTION
+from utils.mongodb_message_builder import build_message_bucket
+
+CONVERSATIONS_COLLECTION = "rag_conversations"
+
+
+def flatten_messages(raw_messages: list) -> list:
+    # Messages used to be pushed as single-element lists
+    messages = []
+    for item in raw_messages:
+        if isinstance(item, dict):
+            messages.append(item)
+        elif isinstance(item, list):
+            messages.extend(m for m in item if isinstance(m, dict))
+    return messages
+
+
+def build_buckets(conversation_id: str, messages: list, bucket_size: int) -> list:
+    buckets = [
+        build_message_bucket(conversation_id, seq, start, messages[start:start + bucket_size])
+        for seq, start in enumerate(range(0, len(messages), bucket_size))
+    ]
+    # Only the newest bucket takes appends
+    for bucket in buckets[:-1]:
+        bucket["open"] = False
+    return buckets
+
+
+def number_buckets(buckets, conversation_id: str, dry_run: bool) -> int:
+    """
+    Gives buckets without a `seq` (older than every numbered one) the first
+    numbers, in insertion order, then records every bucket's `start` and
+    leaves only the newest one open.
+    """
+    legacy = list(buckets.find({"conversation_id": conversation_id, "seq": {"$exists": False}}, {"_id": 1}).sort("_id", 1))
+    if dry_run:
+        return len(legacy)
+    if legacy:
+        # Shift the numbered buckets first, highest seq first to keep seq unique
+        for bucket in buckets.find({"conversation_id": conversation_id, "seq": {"$exists": True}}).sort("seq", -1):
+            buckets.update_one({"_id": bucket["_id"]}, {"$set": {"seq": bucket["seq"] + len(legacy)}})
+        for seq, bucket in enumerate(legacy):
+            buckets.update_one({"_id": bucket["_id"]}, {"$set": {"seq": seq}})
+
+    numbered = list(buckets.find({"conversation_id": conversation_id}, {"count": 1}).sort("seq", 1))
+    start = 0
+    for position, bucket in enumerate(numbered):
+        buckets.update_one(
+            {"_id": bucket["_id"]},
+            {"$set": {"start": start, "open": position == len(numbered) - 1}},
+        )
+        start += bucket.get("count", 0)
+    return len(legacy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be migrated")
+    args = parser.parse_args()
+
+    instance = MongoDBInstance()
+    conversations = instance.get_collection(CONVERSATIONS_COLLECTION)
+    buckets = instance.get_collection(MESSAGE_BUCKETS_COLLECTION)
+
+    migrated = 0
+    total_messages = 0
+    for conversation in conversations.find({"messages": {"$exists": True}}):
+        conversation_id = conversation["conversation_id"]
+        messages = flatten_messages(conversation["messages"])
+        new_buckets = build_buckets(conversation_id, messages, MESSAGE_BUCKET_SIZE)
+        print(f"{conversation_id}: {len(messages)} messages -> {len(new_buckets)} buckets")
+
+        if not args.dry_run:
+            # Replace buckets left over from an interrupted run, then drop the legacy array
+            buckets.delete_many({"conversation_id": conversation_id})
+            if new_buckets:
+                buckets.insert_many(new_buckets)
+            conversations.update_one(
+                {"_id": conversation["_id"]},
+                {
+                    "$unset": {"messages": ""},
+                    "$set": {"schema_version": CONVERSATION_SCHEMA_VERSION},
+                },
+            )
+
+        migrated += 1
+        total_messages += len(messages)
+
+    numbered = 0
+    unnumbered = {"$or": [{"seq": {"$exists": False}}, {"start": {"$exists": False}}]}
+    for conversation_id in buckets.distinct("conversation_id", unnumbered):
+        count = number_buckets(buckets, conversation_id, args.dry_run)
+        print(f"{conversation_id}: {count} buckets without seq")
+        numbered += count
+
+    if not args.dry_run:
+        for collection_name, indexes in INDEXES.items():
+            instance.get_collection(collection_name).create_indexes(indexes)
+            print(f"Ensured indexes on {collection_name}")
+
+    action = "Would migrate" if args.dry_run else "Migrated"
+    print(f"{action} {migrated} conversations ({total_messages} messages), numbered {numbered} buckets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Trains the fast-path router centroids from the logged LLM routing decisions.
+
+Usage (from the repository root):
+    python scripts/train_router.py [--log PATH] [--out PATH]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from services.rag_agent.router import ROUTER_MODEL_PATH, ROUTER_QUERY_LOG_PATH, train_router
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", default=ROUTER_QUERY_LOG_PATH, help="JSONL query log written by the router")
+    parser.add_argument("--out", default=ROUTER_MODEL_PATH, help="Where to write the centroid model")
+    args = parser.parse_args()
+
+    counts = train_router(args.log, args.out)
+    for tool_name, count in sorted(counts.items()):
+        print(f"{tool_name}: {count} examples")
+    print(f"Router model written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app is run from app/ with absolute imports (`from services... import`)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
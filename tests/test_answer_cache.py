@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.ingestion import corpus_version
+from services.rag_agent import answer_cache
+from services.rag_agent.answer_cache import SemanticAnswerCache
+
+VECTORS = {
+    "how many leave days do i get": [1.0, 0.0, 0.0],
+    "how many days of leave do i get": [0.99, 0.05, 0.0],
+    "who is the ceo": [0.0, 1.0, 0.0],
+}
+
+
+class StubEmbeddings:
+    def __init__(self):
+        self.embedded = []
+
+    async def aembed_query(self, query):
+        self.embedded.append(query)
+        return VECTORS[query]
+
+
+@pytest.fixture(autouse=True)
+def local_corpus_version(monkeypatch):
+    # No MongoDB here: every worker's version is the local one
+    async def sync_corpus_version(collection_name):
+        return corpus_version.get_corpus_version(collection_name)
+
+    monkeypatch.setattr(answer_cache, "sync_corpus_version", sync_corpus_version)
+
+
+def make_cache(**kwargs) -> SemanticAnswerCache:
+    return SemanticAnswerCache("test_answers", StubEmbeddings().aembed_query, **kwargs)
+
+
+def test_similar_question_is_served_from_the_cache():
+    cache = make_cache(threshold=0.95)
+
+    async def scenario():
+        await cache.store("how many leave days do i get", "20 days")
+        return (
+            await cache.lookup("how many days of leave do i get"),
+            await cache.lookup("who is the ceo"),
+        )
+
+    assert asyncio.run(scenario()) == ("20 days", None)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_corpus_change_clears_the_cache():
+    cache = make_cache()
+
+    async def scenario():
+        await cache.store("how many leave days do i get", "20 days")
+        corpus_version.bump_corpus_version("test_answers")
+        return await cache.lookup("how many leave days do i get")
+
+    assert asyncio.run(scenario()) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_answer_computed_before_an_upload_is_not_stored():
+    cache = make_cache()
+
+    async def scenario():
+        version = cache.corpus_version()
+        corpus_version.bump_corpus_version("test_answers")
+        await cache.store("how many leave days do i get", "20 days", version)
+
+    asyncio.run(scenario())
+    assert cache.stats()["entries"] == 0
+
+
+def test_expired_and_evicted_entries_are_not_served():
+    cache = make_cache(ttl_seconds=0.0, max_entries=1)
+
+    async def scenario():
+        await cache.store("who is the ceo", "Jane")
+        await cache.store("how many leave days do i get", "20 days")
+        return await cache.lookup("how many leave days do i get"), await cache.lookup("who is the ceo")
+
+    assert asyncio.run(scenario()) == (None, None)
+
+
+def test_process_wide_cache_embeds_through_the_registry_model(monkeypatch):
+    embeddings = StubEmbeddings()
+
+    async def aget_vector_store(name):
+        return SimpleNamespace(embedding_model=embeddings)
+
+    monkeypatch.setattr(answer_cache, "aget_vector_store", aget_vector_store)
+    monkeypatch.setattr(answer_cache, "_answer_cache", None)
+    cache = answer_cache.get_answer_cache()
+
+    async def scenario():
+        await cache.store("how many leave days do i get", "20 days")
+        return await cache.lookup("how many days of leave do i get")
+
+    assert asyncio.run(scenario()) == "20 days"
+    assert embeddings.embedded == ["how many leave days do i get", "how many days of leave do i get"]
@@ -0,0 +1,70 @@
+from langchain_core.documents import Document
+
+from services.rag_agent import context_packer
+from services.rag_agent.context_packer import merge_hits, pack_context
+
+PAGE = (
+    "Employees accrue twenty days of paid leave per year. Leave requests go to the line manager, "
+    "who approves them within five working days. Unused leave carries over up to five days."
+)
+
+
+def hit(text: str, score: float, page_no: int = 0, file_name: str = "handbook.pdf"):
+    return Document(page_content=text, metadata={"file_name": file_name, "page_no": page_no}), score
+
+
+def word_tokenizer(monkeypatch):
+    # One token per word keeps the budgets readable and independent of tiktoken
+    monkeypatch.setattr(
+        context_packer, "get_token_counter",
+        lambda model_name=None: (lambda text: text.split(), lambda tokens: " ".join(tokens)),
+    )
+
+
+def test_overlapping_chunks_of_a_page_merge_back():
+    hits = [hit(PAGE[:110], 0.9), hit(PAGE[70:], 0.7)]
+
+    blocks = merge_hits(hits)
+
+    assert len(blocks) == 1
+    assert blocks[0].text == PAGE
+    assert blocks[0].num_chunks == 2
+    assert blocks[0].score == 0.9
+
+
+def test_duplicates_and_other_pages_are_kept_apart():
+    hits = [hit(PAGE, 0.5), hit(PAGE[:60], 0.8), hit(PAGE, 0.6, page_no=3)]
+
+    blocks = merge_hits(hits)
+
+    # The contained chunk is absorbed, the same text on another page is a duplicate
+    assert len(blocks) == 1
+    assert blocks[0].score == 0.8
+
+
+def test_blocks_are_packed_by_score_within_the_budget(monkeypatch):
+    word_tokenizer(monkeypatch)
+    hits = [
+        hit("low score block " * 5, 0.2, page_no=1),
+        hit("best block", 0.9, page_no=2),
+        hit("second block that is far too long " * 10, 0.8, page_no=3),
+        hit("small third", 0.5, page_no=4),
+    ]
+
+    packed = pack_context(hits, token_budget=20)
+
+    # The too-long block is skipped in favour of the smaller, lower-scored ones
+    assert packed["text"] == "best block\n\nsmall third\n\n" + "low score block " * 5
+    assert packed["blocks_used"] == 3
+    assert packed["tokens"] == 19
+    assert packed["blocks"] == 4
+
+
+def test_best_block_is_cut_when_nothing_fits(monkeypatch):
+    word_tokenizer(monkeypatch)
+
+    packed = pack_context([hit("one two three four five six", 0.9)], token_budget=4)
+
+    assert packed["text"] == "one two three four"
+    assert packed["blocks_used"] == 1
+    assert packed["tokens"] == 4
@@ -0,0 +1,186 @@
+import asyncio
+
+from pymongo import DESCENDING
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import UpdateResult
+
+from utils import crud
+from utils.crud import ConversationStore
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, key, direction):
+        self.documents.sort(key=lambda doc: doc.get(key, -1), reverse=direction == DESCENDING)
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    async def to_list(self):
+        return self.documents
+
+
+class FakeHeaders:
+    """The conversation header queries ConversationStore makes."""
+
+    def __init__(self):
+        self.headers = {}
+        self.reads = 0
+
+    async def insert_one(self, header):
+        self.headers[header["conversation_id"]] = dict(header)
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        await asyncio.sleep(0)
+        header = self.headers.get(query["conversation_id"])
+        return dict(header) if header else None
+
+
+class FakeBuckets:
+    """
+    Message buckets with the unique (conversation_id, seq) index: inserting
+    a bucket whose seq is taken raises DuplicateKeyError.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.landed = []
+        self.round_trips = 0
+
+    def _of(self, conversation_id):
+        return sorted(
+            (bucket for (cid, _), bucket in self.buckets.items() if cid == conversation_id),
+            key=lambda bucket: bucket["seq"],
+        )
+
+    async def insert_one(self, bucket):
+        self.round_trips += 1
+        await asyncio.sleep(0)
+        key = (bucket["conversation_id"], bucket["seq"])
+        if key in self.buckets:
+            raise DuplicateKeyError("E11000 duplicate key")
+        self.buckets[key] = dict(bucket, messages=list(bucket["messages"]))
+        self.landed.extend(bucket["messages"])
+
+    async def update_one(self, query, update):
+        self.round_trips += 1
+        await asyncio.sleep(0)
+        matched = [
+            bucket for bucket in self._of(query["conversation_id"])
+            if all(bucket.get(key) == value for key, value in query.items() if key not in ("conversation_id", "count"))
+            and ("count" not in query or bucket["count"] <= query["count"]["$lte"])
+        ]
+        if matched:
+            bucket = matched[0]
+            bucket.update(update["$set"])
+            if "$push" in update:
+                messages = update["$push"]["messages"]["$each"]
+                bucket["messages"].extend(messages)
+                bucket["count"] += update["$inc"]["count"]
+                self.landed.extend(messages)
+        return UpdateResult({"n": len(matched[:1])}, acknowledged=True)
+
+    async def find_one(self, query, projection=None, sort=None):
+        self.round_trips += 1
+        await asyncio.sleep(0)
+        buckets = self._of(query["conversation_id"])
+        return dict(buckets[-1]) if buckets else None
+
+    def find(self, query, projection):
+        keep = projection["messages"]["$slice"]
+        return FakeCursor([
+            {**bucket, "messages": bucket["messages"][keep:]}
+            for bucket in self._of(query["conversation_id"])
+        ])
+
+    async def aggregate(self, pipeline):
+        buckets = self._of(pipeline[0]["$match"]["conversation_id"])
+        messages = [message for bucket in buckets for message in bucket["messages"]]
+        start = pipeline[3]["$skip"]
+        return FakeCursor(messages[start:start + pipeline[4]["$limit"]])
+
+
+def make_store() -> ConversationStore:
+    store = ConversationStore.__new__(ConversationStore)
+    store.collection_name = "rag_conversations"
+    store.collection = FakeHeaders()
+    store.buckets = FakeBuckets()
+    return store
+
+
+def message(number: int) -> dict:
+    return {"user_query": f"q{number}", "message_response": f"a{number}"}
+
+
+def test_concurrent_appends_fill_one_open_bucket_at_a_time(monkeypatch):
+    monkeypatch.setattr(crud, "MESSAGE_BUCKET_SIZE", 3)
+    store = make_store()
+
+    async def scenario():
+        await store.create_new_conversation({"conversation_id": "c1", "messages": [message(0)]})
+        await asyncio.gather(*(store.append_message_to_conversation("c1", message(n)) for n in range(1, 20)))
+        return (
+            await store.find_recent_messages("c1", 7),
+            await store.find_messages_range("c1", 0, 20),
+        )
+
+    recent, everything = asyncio.run(scenario())
+
+    buckets = sorted(store.buckets.buckets.values(), key=lambda bucket: bucket["seq"])
+    assert [bucket["seq"] for bucket in buckets] == list(range(7))
+    assert [bucket["count"] for bucket in buckets] == [3, 3, 3, 3, 3, 3, 2]
+    assert [bucket["start"] for bucket in buckets] == [0, 3, 6, 9, 12, 15, 18]
+    assert [bucket["open"] for bucket in buckets] == [False] * 6 + [True]
+    # Reads return the messages in the order they were appended
+    assert everything == store.buckets.landed
+    assert recent["messages"] == store.buckets.landed[-7:]
+    assert recent["total_messages"] == 20
+
+
+def test_changing_the_bucket_size_only_affects_the_open_bucket(monkeypatch):
+    monkeypatch.setattr(crud, "MESSAGE_BUCKET_SIZE", 2)
+    store = make_store()
+
+    async def scenario():
+        await store.create_new_conversation({"conversation_id": "c1", "messages": [message(0)]})
+        for n in range(1, 5):
+            await store.append_message_to_conversation("c1", message(n))
+        monkeypatch.setattr(crud, "MESSAGE_BUCKET_SIZE", 4)
+        for n in range(5, 9):
+            await store.append_message_to_conversation("c1", message(n))
+        return await store.find_messages_range("c1", 0, 20)
+
+    messages = asyncio.run(scenario())
+
+    assert messages == [message(n) for n in range(9)]
+    buckets = sorted(store.buckets.buckets.values(), key=lambda bucket: bucket["seq"])
+    # The older, full buckets are never appended to again
+    assert [bucket["count"] for bucket in buckets] == [2, 2, 4, 1]
+
+
+def test_append_to_the_open_bucket_is_one_round_trip(monkeypatch):
+    monkeypatch.setattr(crud, "MESSAGE_BUCKET_SIZE", 3)
+    store = make_store()
+
+    async def scenario():
+        await store.create_new_conversation({"conversation_id": "c1", "messages": [message(0)]})
+        store.buckets.round_trips = 0
+        await store.append_message_to_conversation("c1", message(1))
+
+    asyncio.run(scenario())
+
+    assert store.buckets.round_trips == 1
+    assert store.collection.reads == 0
+
+
+def test_append_to_an_unknown_conversation_stores_nothing():
+    store = make_store()
+
+    asyncio.run(store.append_message_to_conversation("missing", message(1)))
+
+    assert store.buckets.buckets == {}
@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from qdrant_client import AsyncQdrantClient, models
+
+from services.ingestion.document_registry import diff_chunk_hashes, make_chunk_hash, make_point_id
+from services.ingestion.vectorstore import LangChainQdrantStore
+
+
+def test_diff_chunk_hashes():
+    diff = diff_chunk_hashes(["a", "b", "c"], ["b", "d", "c", "d"])
+
+    assert diff == {"added": ["d"], "stale": ["a"], "unchanged": ["b", "c"]}
+
+
+def test_diff_against_no_previous_revision():
+    assert diff_chunk_hashes([], ["a", "b"]) == {"added": ["a", "b"], "stale": [], "unchanged": []}
+
+
+def test_point_ids_are_deterministic_per_document_and_chunk():
+    assert make_point_id("doc-1", "hash") == make_point_id("doc-1", "hash")
+    assert make_point_id("doc-1", "hash") != make_point_id("doc-2", "hash")
+    assert make_point_id("doc-1", "hash") != make_point_id("doc-1", "other")
+
+
+def test_chunk_hash_covers_the_page():
+    assert make_chunk_hash("same text", 1) != make_chunk_hash("same text", 2)
+    assert make_chunk_hash("same  text\n", 1) == make_chunk_hash("same text", 1)
+
+
+class FakeMetadataStore:
+    def __init__(self):
+        self.deleted = []
+
+    async def delete_unregistered_metadata_records(self, file_name):
+        self.deleted.append(file_name)
+
+
+def test_chunks_stored_before_the_registry_are_deleted_by_file_name():
+    client = AsyncQdrantClient(":memory:")
+    store = SimpleNamespace(aclient=client, collection_name="docs")
+    metadata_store = FakeMetadataStore()
+
+    async def scenario():
+        await client.create_collection(
+            "docs", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE)
+        )
+        await client.upsert("docs", points=[
+            models.PointStruct(id=1, vector=[1, 0], payload={"metadata": {"file_name": "a.pdf"}}),
+            models.PointStruct(id=2, vector=[1, 0], payload={"metadata": {"file_name": "a.pdf", "document_id": "doc-a"}}),
+            models.PointStruct(id=3, vector=[1, 0], payload={"metadata": {"file_name": "b.pdf"}}),
+        ])
+        await LangChainQdrantStore._delete_unregistered_chunks(store, "doc-a", "a.pdf", metadata_store)
+        points, _ = await client.scroll("docs")
+        return sorted(point.id for point in points)
+
+    assert asyncio.run(scenario()) == [2, 3]
+    assert metadata_store.deleted == ["a.pdf"]
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_qdrant import SparseEmbeddings, SparseVector
+
+from services.ingestion.embedding_cache import CachedEmbeddings, CachedSparseEmbeddings, EmbeddingCache
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return [float(len(text)), -0.5]
+
+
+class CountingSparseEmbeddings(SparseEmbeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [SparseVector(indices=[len(text), 7], values=[1.0, 0.25]) for text in texts]
+
+    def embed_query(self, text):
+        self.embedded.append(text)
+        return SparseVector(indices=[len(text)], values=[1.0])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(path=str(tmp_path / "cache.sqlite3"))
+
+
+def test_repeated_texts_are_embedded_once(cache):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, "test-model", cache)
+
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["beta", "gamma"])
+
+    assert model.embedded == ["alpha", "beta", "gamma"]
+    assert first == [[5.0, 0.5], [4.0, 0.5], [5.0, 0.5]]
+    assert second == [[4.0, 0.5], [5.0, 0.5]]
+    assert cache.stats()["entries"] == 3
+
+
+def test_entries_are_keyed_by_model_and_kind(cache):
+    model = CountingEmbeddings()
+
+    CachedEmbeddings(model, "model-a", cache).embed_documents(["alpha"])
+    CachedEmbeddings(model, "model-b", cache).embed_documents(["alpha"])
+    query = CachedEmbeddings(model, "model-a", cache).embed_query("alpha")
+
+    assert model.embedded == ["alpha", "alpha", "alpha"]
+    assert query == [5.0, -0.5]
+
+
+def test_cache_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    CachedEmbeddings(CountingEmbeddings(), "test-model", EmbeddingCache(path=path)).embed_documents(["alpha"])
+
+    model = CountingEmbeddings()
+    restarted = EmbeddingCache(path=path)
+    assert CachedEmbeddings(model, "test-model", restarted).embed_documents(["alpha"]) == [[5.0, 0.5]]
+    assert model.embedded == []
+    assert restarted.stats()["hits"] == 1
+
+
+def test_sparse_vectors_round_trip(cache):
+    model = CountingSparseEmbeddings()
+    embeddings = CachedSparseEmbeddings(model, "bm25", cache)
+
+    embeddings.embed_documents(["alpha"])
+    [vector] = embeddings.embed_documents(["alpha"])
+
+    assert model.embedded == ["alpha"]
+    assert vector.indices == [5, 7]
+    assert vector.values == [1.0, 0.25]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, "test-model", cache)
+
+    embeddings.embed_documents(["a"])
+    embeddings.embed_documents(["b"])
+    embeddings.embed_documents(["c"])
+
+    assert cache.stats()["evictions"] >= 1
+    assert cache.stats()["entries"] <= 2
+    model.embedded.clear()
+    embeddings.embed_documents(["c"])
+    assert model.embedded == []
+
+
+def test_async_query_embedding_goes_through_the_cache(cache):
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, "test-model", cache)
+
+    async def scenario():
+        return [await embeddings.aembed_query("alpha"), await embeddings.aembed_query("alpha")]
+
+    assert asyncio.run(scenario()) == [[5.0, -0.5], [5.0, -0.5]]
+    assert model.embedded == ["alpha"]
@@ -0,0 +1,68 @@
+import random
+
+from services.ingestion.fast_chunker import FastChunker, normalize_page
+from services.ingestion.splitter import TextChunker
+from utils.utils import clean_page_content
+
+WORDS = "policy employee leave request approval manager benefits payroll onboarding".split()
+
+
+def synthetic_page(seed: int, lines: int = 60) -> str:
+    rng = random.Random(seed)
+    return "\n".join(
+        "  ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 14))) for _ in range(lines)
+    )
+
+
+def chunk_spans(text: str, chunks: list) -> list:
+    """(start, end) of every chunk in `text`, searched left to right."""
+    spans = []
+    position = 0
+    for chunk in chunks:
+        start = text.find(chunk, position)
+        assert start != -1, f"chunk not found in order: {chunk[:40]!r}"
+        spans.append((start, start + len(chunk)))
+        position = start + 1
+    return spans
+
+
+def test_normalize_page_matches_clean_page_content():
+    for seed in range(20):
+        page = synthetic_page(seed)
+        assert clean_page_content(normalize_page(page)) == normalize_page(page)
+        assert normalize_page(page) == clean_page_content(page).replace("\n\n", "\n")
+
+
+def test_short_page_is_one_chunk_like_the_recursive_splitter():
+    page = "A short   page\n\n with one paragraph."
+    recursive = [clean_page_content(chunk) for chunk in TextChunker(chunking_strategy="recursive").split(page)]
+
+    assert FastChunker().split_text(page) == recursive
+
+
+def test_chunks_respect_size_and_overlap_like_the_recursive_splitter():
+    # Boundaries differ between the strategies, the size and overlap limits do not
+    for strategy in ("fused", "recursive"):
+        chunker = TextChunker(chunk_size=300, chunk_overlap=60, chunking_strategy=strategy)
+        for seed in range(20):
+            text = normalize_page(synthetic_page(seed))
+            spans = chunk_spans(text, chunker.split(text))
+
+            assert all(end - start <= 300 for start, end in spans)
+            for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+                assert previous_end - start <= 60
+                # No text is skipped between two chunks
+                assert not text[previous_end:start].strip()
+            assert not text[:spans[0][0]].strip() and not text[spans[-1][1]:].strip()
+
+
+def test_split_documents_keeps_the_recursive_metadata():
+    from langchain_core.documents import Document
+
+    document = Document(page_content=synthetic_page(1), metadata={"file_name": "a.pdf", "page": 4})
+    fused = TextChunker(chunk_size=300, chunk_overlap=60, chunking_strategy="fused").split_documents([document])
+    recursive = TextChunker(chunk_size=300, chunk_overlap=60, chunking_strategy="recursive").split_documents([document])
+
+    assert {"file_name": "a.pdf", "page_no": 4} == {
+        key: fused[0].metadata[key] for key in ("file_name", "page_no")
+    } == {key: recursive[0].metadata[key] for key in ("file_name", "page_no")}
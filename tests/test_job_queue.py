@@ -0,0 +1,199 @@
+import asyncio
+import os
+
+import pytest
+
+from services.ingestion import job_queue
+from services.ingestion.job_queue import IngestionJobQueue, JobQueueFullError
+
+
+class FakeRegistry:
+    def __init__(self, current: bool = False):
+        self.current = current
+
+    async def ais_current(self, document_id, content_hash):
+        return self.current
+
+
+class FakeVectorStore:
+    def __init__(self, error: Exception = None):
+        self.error = error
+
+    async def astore_document_stream(self, chunks, progress_callback=None, content_hash=None, clean=True):
+        if self.error is not None:
+            raise self.error
+        num_added = 0
+        for _ in chunks:
+            num_added += 1
+        progress_callback("embedded", num_added)
+        progress_callback("upserted", num_added)
+        return {
+            "num_added": num_added,
+            "num_unchanged": 0,
+            "num_deleted": 0,
+            "elapsed_seconds": 0.0,
+            "chunks_per_second": 0.0,
+        }
+
+
+def use_fakes(monkeypatch, registry: FakeRegistry, vector_store: FakeVectorStore):
+    async def aget_vector_store(name):
+        return vector_store
+
+    monkeypatch.setattr(job_queue, "get_document_registry", lambda: registry)
+    monkeypatch.setattr(job_queue, "aget_vector_store", aget_vector_store)
+
+
+def run_jobs(queue: IngestionJobQueue, *uploads):
+    async def scenario():
+        try:
+            jobs = [await queue.submit(path, path.name, "test_collection", "hash") for path in uploads]
+            await queue._queue.join()
+            return jobs
+        finally:
+            await queue.stop()
+
+    return asyncio.run(scenario())
+
+
+def write_upload(tmp_path, name="notes.txt", text="Paid leave is 20 days per year.\n"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_submitted_job_completes_and_reports_progress(monkeypatch, tmp_path):
+    use_fakes(monkeypatch, FakeRegistry(), FakeVectorStore())
+    upload = write_upload(tmp_path)
+    queue = IngestionJobQueue(num_workers=1, parse_processes=1)
+
+    [job] = run_jobs(queue, upload)
+
+    status = queue.get_job(job.job_id).to_dict()
+    assert status["status"] == "completed"
+    assert status["progress"]["pages_parsed"] == 1
+    assert status["progress"]["chunks_total"] == status["progress"]["chunks_upserted"] == 1
+    assert status["result"]["chunks_added"] == 1
+    assert status["result"]["preview"].startswith("Paid leave")
+    assert status["started_at"] and status["finished_at"]
+    # The spooled upload is removed once the job is done
+    assert not upload.exists()
+
+
+def test_identical_reupload_completes_without_parsing(monkeypatch, tmp_path):
+    use_fakes(monkeypatch, FakeRegistry(current=True), FakeVectorStore(RuntimeError("must not run")))
+    queue = IngestionJobQueue(num_workers=1, parse_processes=1)
+
+    [job] = run_jobs(queue, write_upload(tmp_path))
+
+    assert job.status == "completed"
+    assert job.result["unchanged"] is True
+    assert job.pages_parsed == 0
+
+
+def test_failed_job_records_the_error_and_later_jobs_still_run(monkeypatch, tmp_path):
+    vector_store = FakeVectorStore(RuntimeError("embedding service unavailable"))
+    use_fakes(monkeypatch, FakeRegistry(), vector_store)
+    queue = IngestionJobQueue(num_workers=1, parse_processes=1)
+    failing, succeeding = write_upload(tmp_path, "a.txt"), write_upload(tmp_path, "b.txt")
+
+    async def scenario():
+        try:
+            failed = await queue.submit(failing, failing.name, "test_collection")
+            await queue._queue.join()
+            vector_store.error = None
+            completed = await queue.submit(succeeding, succeeding.name, "test_collection")
+            await queue._queue.join()
+            return failed, completed
+        finally:
+            await queue.stop()
+
+    failed, completed = asyncio.run(scenario())
+
+    assert failed.status == "failed"
+    assert failed.error == "embedding service unavailable"
+    assert not failing.exists()
+    assert completed.status == "completed"
+
+
+def test_submit_rejects_jobs_once_the_queue_is_full(monkeypatch, tmp_path):
+    use_fakes(monkeypatch, FakeRegistry(current=True), FakeVectorStore())
+    queue = IngestionJobQueue(num_workers=1, parse_processes=1, max_queued_jobs=1)
+    upload = write_upload(tmp_path)
+
+    async def scenario():
+        try:
+            # The worker does not get to run between the two submits
+            await queue.submit(upload, upload.name, "test_collection")
+            with pytest.raises(JobQueueFullError):
+                await queue.submit(upload, upload.name, "test_collection")
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+    assert len(queue.list_jobs()) == 1
+
+
+def test_only_finished_jobs_are_forgotten_when_the_history_is_full(monkeypatch, tmp_path):
+    use_fakes(monkeypatch, FakeRegistry(current=True), FakeVectorStore())
+    queue = IngestionJobQueue(num_workers=1, parse_processes=1, max_tracked_jobs=2)
+    uploads = [write_upload(tmp_path, f"{n}.txt") for n in range(4)]
+
+    async def scenario():
+        try:
+            jobs = []
+            for upload in uploads[:3]:
+                jobs.append(await queue.submit(upload, upload.name, "test_collection"))
+                await queue._queue.join()
+            # Still queued, so kept even though the history is over its limit
+            jobs.append(await queue.submit(uploads[3], uploads[3].name, "test_collection"))
+            jobs.append(await queue.submit(uploads[3], uploads[3].name, "test_collection"))
+            tracked = [job.job_id for job in queue.list_jobs()]
+            await queue._queue.join()
+            return jobs, tracked
+        finally:
+            await queue.stop()
+
+    jobs, tracked = asyncio.run(scenario())
+
+    assert queue.get_job(jobs[0].job_id) is None
+    assert tracked == [job.job_id for job in jobs[3:]]
+
+
+class CrashingLoader:
+    """Parses by killing its worker process, like a PDF that crashes PyMuPDF."""
+
+    stats = {}
+
+    def __init__(self, path, executor=None):
+        self.executor = executor
+
+    def lazy_load(self):
+        self.executor.submit(os._exit, 1).result()
+        yield from ()
+
+
+def test_crashed_parse_process_fails_the_job_and_the_pool_is_replaced(monkeypatch, tmp_path):
+    use_fakes(monkeypatch, FakeRegistry(), FakeVectorStore())
+    queue = IngestionJobQueue(num_workers=1, parse_processes=1)
+    crashing, healthy = write_upload(tmp_path, "broken.pdf"), write_upload(tmp_path, "notes.txt")
+
+    async def scenario():
+        try:
+            monkeypatch.setattr(job_queue, "ParallelDocumentLoader", CrashingLoader)
+            failed = await queue.submit(crashing, crashing.name, "test_collection")
+            await queue._queue.join()
+            monkeypatch.undo()
+            use_fakes(monkeypatch, FakeRegistry(), FakeVectorStore())
+            completed = await queue.submit(healthy, healthy.name, "test_collection")
+            await queue._queue.join()
+            return failed, completed
+        finally:
+            await queue.stop()
+
+    failed, completed = asyncio.run(scenario())
+
+    assert failed.status == "failed"
+    assert "parse process died" in failed.error
+    assert completed.status == "completed"
+    assert completed.pages_parsed == 1
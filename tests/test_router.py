@@ -0,0 +1,123 @@
+import json
+import os
+
+import pytest
+
+from services.rag_agent.router import (
+    BOOKING_TOOL,
+    KEYWORD_ONLY_CONFIDENCE,
+    SEARCH_TOOL,
+    FastPathRouter,
+    has_booking_cue,
+    has_filter_cue,
+    redact_booking_query,
+    train_router,
+)
+
+
+def make_router(tmp_path, **kwargs) -> FastPathRouter:
+    return FastPathRouter(
+        model_path=str(tmp_path / "router.json"),
+        query_log_path=str(tmp_path / "logs" / "queries.jsonl"),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("query", [
+    "Can you set up a call with me?",
+    "I'd like to book an interview",
+    "Are you available on 2024-07-20?",
+    "Is next Tuesday at noon free?",
+    "Reach me at jane@example.com",
+    "Let's catch up on July 20th",
+])
+def test_booking_cues(query):
+    assert has_booking_cue(query)
+
+
+@pytest.mark.parametrize("query", [
+    "What does handbook.pdf say about leave?",
+    "Summarize page 4",
+    "What was uploaded this week?",
+    "Which documents were added since Monday?",
+])
+def test_filter_cues(query):
+    assert has_filter_cue(query)
+
+
+def test_plain_question_has_no_cues():
+    query = "How many days of paid leave do employees get?"
+    assert not has_booking_cue(query)
+    assert not has_filter_cue(query)
+
+
+def test_untrained_router_always_falls_back_to_the_llm(tmp_path):
+    router = make_router(tmp_path)
+
+    assert router.confidence("How many days of paid leave do employees get?") == KEYWORD_ONLY_CONFIDENCE
+    assert router.route("How many days of paid leave do employees get?") is None
+    assert router.stats()["llm_fallback"] == 1
+
+
+def test_cues_and_follow_ups_go_to_the_llm(tmp_path):
+    router = make_router(tmp_path, threshold=0.0)
+
+    assert router.confidence("Book an interview for tomorrow") == 0.0
+    assert router.confidence("What is on page 3 of handbook.pdf?") == 0.0
+    assert router.confidence("What does it say about that?", has_history=True) == 0.0
+    assert router.confidence("What does it say about that?") > 0.0
+
+
+def test_trained_router_takes_the_fast_path_for_searches(tmp_path):
+    router = make_router(tmp_path)
+    questions = [
+        "What is the paid leave policy?",
+        "How many vacation days do employees get?",
+        "Explain the remote work policy",
+        "What benefits does the company offer?",
+    ]
+    bookings = [
+        "Book an interview for me",
+        "I want to schedule an interview",
+        "Please book me an interview slot",
+        "Schedule my interview please",
+    ]
+    for query in questions:
+        router.record(query, SEARCH_TOOL)
+    for query in bookings:
+        router.record(query, BOOKING_TOOL)
+
+    counts = train_router(router.query_log_path, router.model_path, router.dimensions)
+    router.load()
+
+    assert counts == {SEARCH_TOOL: 4, BOOKING_TOOL: 4}
+    assert router.route("What is the paid leave policy for employees?") == SEARCH_TOOL
+    assert router.stats()["trained"] is True
+
+
+def test_booking_decisions_are_logged_redacted(tmp_path):
+    router = make_router(tmp_path)
+
+    router.record("Book an interview for John Smith, john@acme.com, +1 415 555 0100 on July 20", BOOKING_TOOL)
+    router.record("What does Acme offer?", SEARCH_TOOL)
+
+    with open(router.query_log_path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert entries[0]["query"] == "Book an interview for name name, email, phone on date"
+    assert entries[1]["query"] == "What does Acme offer?"
+    assert os.stat(router.query_log_path).st_mode & 0o777 == 0o600
+
+
+def test_redaction_keeps_the_booking_wording():
+    assert redact_booking_query("schedule a call with Priya next week") == "schedule a call with name date"
+
+
+def test_query_log_is_rotated_past_its_size_limit(tmp_path):
+    router = make_router(tmp_path, query_log_max_bytes=200)
+
+    for n in range(10):
+        router.record(f"What is policy number {n}?", SEARCH_TOOL)
+
+    assert os.path.getsize(router.query_log_path) <= 200
+    assert os.path.exists(router.query_log_path + ".1")
+    assert not os.path.exists(router.query_log_path + ".2")
@@ -0,0 +1,39 @@
+from schemas.schemas import SearchFilters
+from services.ingestion.vectorstore import build_qdrant_filter
+
+
+def conditions_by_key(qdrant_filter) -> dict:
+    return {condition.key: condition for condition in qdrant_filter.must}
+
+
+def test_no_filters_means_no_qdrant_filter():
+    assert build_qdrant_filter(None) is None
+    assert build_qdrant_filter(SearchFilters()) is None
+
+
+def test_pages_are_converted_from_1_based_to_0_based():
+    conditions = conditions_by_key(build_qdrant_filter(SearchFilters(page_from=3, page_to=5)))
+
+    page_range = conditions["metadata.page_no"].range
+    assert page_range.gte == 2
+    assert page_range.lte == 4
+
+
+def test_open_ended_page_range():
+    conditions = conditions_by_key(build_qdrant_filter(SearchFilters(page_from=1)))
+
+    page_range = conditions["metadata.page_no"].range
+    assert page_range.gte == 0
+    assert page_range.lte is None
+
+
+def test_file_name_and_upload_dates():
+    conditions = conditions_by_key(build_qdrant_filter(SearchFilters(
+        file_name="handbook.pdf", uploaded_after="2024-07-01", uploaded_before="not a date",
+    )))
+
+    assert conditions["metadata.file_name"].match.value == "handbook.pdf"
+    upload_range = conditions["metadata.uploaded_at"].range
+    assert upload_range.gte.year == 2024
+    # Unparseable dates are ignored rather than failing the search
+    assert upload_range.lte is None
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_with_the_same_key_share_one_call():
+    async def scenario():
+        flight = SingleFlight("test")
+        calls = []
+
+        async def work(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return {"key": key}
+
+        results = await asyncio.gather(
+            *(flight.do("a", lambda: work("a")) for _ in range(5)),
+            flight.do("b", lambda: work("b")),
+        )
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+
+    assert sorted(calls) == ["a", "b"]
+    assert all(result is results[0] for result in results[:5])
+    assert flight.stats()["leaders"] == 2
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_key_is_released_once_the_call_completes():
+    async def scenario():
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        first = await flight.do("a", work)
+        second = await flight.do("a", work)
+        return first, second
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_exception_is_shared_by_every_caller():
+    async def scenario():
+        flight = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("search failed")
+
+        return await asyncio.gather(*(flight.do("a", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_call_for_the_others():
+    async def scenario():
+        flight = SingleFlight("test")
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        leader = asyncio.create_task(flight.do("a", work))
+        follower = asyncio.create_task(flight.do("a", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "answer"
+
+
+def test_disabled_flight_runs_every_call():
+    async def scenario():
+        flight = SingleFlight("test", enabled=False)
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(flight.do("a", work) for _ in range(3)))
+        return calls
+
+    assert asyncio.run(scenario()) == 3
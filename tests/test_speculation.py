@@ -0,0 +1,71 @@
+import asyncio
+
+from services.rag_agent.speculation import SpeculativeRetrieval, queries_match
+from utils.single_flight import SingleFlight
+
+
+def test_unchanged_query_matches():
+    assert queries_match("What is the leave policy?", "what is the leave policy")
+
+
+def test_rewritten_query_does_not_match():
+    assert not queries_match("what about page 2?", "leave policy details on page 2 of handbook.pdf")
+
+
+def test_similarity_threshold():
+    speculated = "how many days of paid leave do employees get per year"
+    routed = "how many days of paid leave do employees get"
+
+    # 9 shared words out of 11
+    assert queries_match(speculated, routed, min_similarity=0.8)
+    assert not queries_match(speculated, routed, min_similarity=0.9)
+
+
+def test_queries_without_words_compare_verbatim():
+    assert queries_match("?!", "?!")
+    assert not queries_match("?!", "what")
+
+
+def test_cancelled_speculation_stops_the_shared_search():
+    async def scenario():
+        speculation = SpeculativeRetrieval()
+        flight = SingleFlight("search")
+        started, finished = asyncio.Event(), []
+
+        async def search():
+            started.set()
+            await asyncio.sleep(1)
+            finished.append(True)
+
+        task = speculation.start(flight.do("query", search))
+        await started.wait()
+        await speculation.cancel(task)
+        await asyncio.sleep(0)
+        return flight, finished
+
+    flight, finished = asyncio.run(scenario())
+
+    assert finished == []
+    assert flight.stats()["abandoned"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_speculation_keeps_a_search_another_request_awaits():
+    async def scenario():
+        speculation = SpeculativeRetrieval()
+        flight = SingleFlight("search")
+        started = asyncio.Event()
+
+        async def search():
+            started.set()
+            await asyncio.sleep(0.01)
+            return ["doc"]
+
+        task = speculation.start(flight.do("query", search))
+        await started.wait()
+        other_request = asyncio.create_task(flight.do("query", search))
+        await asyncio.sleep(0)
+        await speculation.cancel(task)
+        return await other_request
+
+    assert asyncio.run(scenario()) == ["doc"]
@@ -0,0 +1,33 @@
+import pytest
+from langchain_core.documents import Document
+
+from services.ingestion.splitter import TextChunker
+from utils.mongodb_message_builder import build_metadata_records_from_documents
+
+
+@pytest.mark.parametrize("strategy", ["recursive", "fused"])
+def test_chunks_keep_the_table_extraction_mode_of_their_page(strategy):
+    page = Document(
+        page_content="Leave policy. " * 200,
+        metadata={"file_name": "handbook.pdf", "page": 2, "table_extraction": "full", "producer": "PyMuPDF"},
+    )
+
+    chunks = TextChunker(chunking_strategy=strategy).split_documents([page])
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.metadata == {
+            "file_name": "handbook.pdf",
+            "chunking_strategy": strategy,
+            "page_no": 2,
+            "table_extraction": "full",
+        }
+    assert build_metadata_records_from_documents(chunks)[0]["metadata"]["table_extraction"] == "full"
+
+
+def test_text_file_chunks_have_no_table_extraction_mode():
+    page = Document(page_content="Plain text notes.", metadata={"file_name": "notes.txt"})
+
+    [chunk] = TextChunker().split_documents([page])
+
+    assert "table_extraction" not in chunk.metadata
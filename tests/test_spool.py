@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from services.ingestion.spool import UploadError, UploadTooLargeError, spool_upload
+
+BOUNDARY = "testboundary"
+
+
+class FakeRequest:
+    """Just what spool_upload reads from a Starlette request."""
+
+    def __init__(self, body: bytes, piece_size: int = 64, content_length: bool = True):
+        self.headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+        if content_length:
+            self.headers["content-length"] = str(len(body))
+        self._body = body
+        self._piece_size = piece_size
+
+    async def stream(self):
+        for start in range(0, len(self._body), self._piece_size):
+            yield self._body[start:start + self._piece_size]
+
+
+def multipart_body(file_name: str, content: bytes, field_name: str = "file") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field_name}"; filename="{file_name}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def test_upload_within_limit_is_spooled(tmp_path):
+    content = b"x" * 500
+    request = FakeRequest(multipart_body("notes.txt", content))
+
+    # The announced length includes the multipart framing, which chunk_size leaves room for
+    upload = asyncio.run(spool_upload(request, max_bytes=500, spool_dir=str(tmp_path), chunk_size=1024))
+
+    assert upload.file_name == "notes.txt"
+    assert upload.size_bytes == 500
+    assert upload.path.read_bytes() == content
+
+
+def test_upload_over_limit_is_rejected_while_streaming(tmp_path):
+    # No content-length, so only the streamed size can trip the limit
+    request = FakeRequest(multipart_body("big.pdf", b"x" * 501), content_length=False)
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(request, max_bytes=500, spool_dir=str(tmp_path), chunk_size=100))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_announced_content_length_over_limit_is_rejected_up_front(tmp_path):
+    request = FakeRequest(multipart_body("big.pdf", b"x" * 5000))
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(request, max_bytes=500, spool_dir=str(tmp_path), chunk_size=100))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unsupported_suffix_is_rejected(tmp_path):
+    request = FakeRequest(multipart_body("image.png", b"x" * 10))
+
+    with pytest.raises(UploadError):
+        asyncio.run(spool_upload(
+            request, max_bytes=500, allowed_suffixes=(".pdf", ".txt"), spool_dir=str(tmp_path),
+        ))
+    assert list(tmp_path.iterdir()) == []